@@ -1,21 +1,32 @@
 from flask import Flask, request, jsonify, session
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 from flask_wtf.csrf import CSRFProtect
-import cv2
 import numpy as np
 import os
+import time
+import threading
 from dotenv import load_dotenv
 
-from camera.hand_tracker import HandTracker
-from sign_recognition.sign_predictor import predict_sign
+from camera.hand_tracker import TrackerPoolTimeout, get_tracker_pool
+from camera.tracker_profiles import add_room_member, remove_member, remove_room_member
+from camera.tracker_sessions import get_tracker_sessions
+from inference.caption_stabilizer import get_caption_stabilizer
+from inference.frame_pipeline import check_payload, close_stream, close_streams, decode_image, decode_payload, frame_result, start_backend, submit_frame
+from inference.frame_scheduler import get_frame_scheduler
+from inference.stage_timing import get_stage_timer
+from inference.landmark_pipeline import LandmarkPayloadError, analyze_landmarks, decode_landmarks
+from inference.process_backend import BackendBusy
+from sentence.sentence_service import get_sentence_service
+from sign_recognition.sign_predictor import preload_model, predict_sign, predict_sign_batch, start_model_watcher
 from routes.auth_routes import auth_bp
 from routes.call_routes import call_bp
 from routes.sign_routes import sign_bp
 from models.user import User
+from config.database import db_instance
 
 load_dotenv()
 
@@ -66,15 +77,45 @@ limiter = Limiter(
 )
 
 # Initialize SocketIO with CORS
+# (several worker processes need a shared message queue, e.g. Redis, to broadcast)
 socketio = SocketIO(app, 
                     cors_allowed_origins=allowed_origins,
                     async_mode='threading',
+                    message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE'),
                     cookie=True,
                     engineio_logger=False,
                     logger=False)
 
-# Initialize hand tracker
-tracker = HandTracker()
+# Set once this process has loaded the model and warmed up MediaPipe
+ready = threading.Event()
+
+def warm_up():
+    """
+    Load the model, run a synthetic frame through the hand tracker and the
+    predictor, then mark this process ready. Runs once per worker process.
+    """
+    if ready.is_set():
+        return
+    # MongoDB connects here, after any pre-fork, so no worker shares a client
+    db_instance.get_db()
+    preload_model()
+    get_tracker_pool().warm_up()
+    get_tracker_sessions().start_sweeper()
+    
+    # Optional worker processes warm up their own graphs and model
+    backend = start_backend()
+    if backend is not None:
+        # Crashed workers are restarted; keep saying so until they are all up
+        while not backend.wait_ready(backend.timeout):
+            print(f"⏳ Inference workers not ready after {backend.timeout:.0f}s: {backend.stats()}", flush=True)
+    predict_sign(np.zeros((21, 3), dtype=np.float32))
+
+    # Swap in retrained models without restarting the server
+    if os.getenv('MODEL_HOT_RELOAD', 'True') == 'True':
+        start_model_watcher()
+
+    ready.set()
+    print(f"🔥 Worker {os.getpid()} warmed up and ready", flush=True)
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -117,15 +158,19 @@ def predict():
         return jsonify({"error": "No frame"}), 400
 
     file = request.files["frame"]
-    npimg = np.frombuffer(file.read(), np.uint8)
-    frame = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
+    frame = decode_image(file.read())
+    if frame is None:
+        return jsonify({"error": "Invalid frame"}), 400
 
-    result = tracker.process(frame)
+    try:
+        result = get_tracker_pool().process(frame)
+    except TrackerPoolTimeout:
+        return jsonify({"error": "Server busy, try again"}), 503
     prediction = "No Hand"
 
     if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            prediction = predict_sign(hand_landmarks)
+        # One model call for every detected hand; keep the last as before
+        prediction = predict_sign_batch(result.multi_hand_landmarks)[-1]
 
     return jsonify({"prediction": prediction})
 
@@ -138,6 +183,11 @@ def handle_options(path):
 # ===== HEALTH CHECK =====
 @app.route('/api/health', methods=['GET'])
 def health_check():
+    if not ready.is_set():
+        return jsonify({
+            'status': 'warming_up',
+            'message': 'Loading sign model and hand tracker'
+        }), 503
     return jsonify({
         'status': 'healthy',
         'message': 'Server is running',
@@ -155,6 +205,10 @@ def handle_connect():
 def handle_disconnect():
     print(f'❌ Client disconnected: {request.sid}')
     
+    # Free the hand tracking sessions of this connection's streams
+    close_streams(request.sid)
+    remove_member(request.sid)
+    
     # Remove from connected users and update status
     user_id = connected_users.pop(request.sid, None)
     if user_id:
@@ -191,6 +245,7 @@ def handle_join_room(data):
     
     if room:
         join_room(room)
+        add_room_member(room, request.sid)
         emit('user_joined', {'user_id': user_id, 'sid': request.sid}, room=room, skip_sid=request.sid)
         print(f'📹 User {user_id} joined room {room}')
 
@@ -202,6 +257,8 @@ def handle_leave_room(data):
     
     if room:
         leave_room(room)
+        close_stream((room, user_id))
+        remove_room_member(room, request.sid)
         emit('user_left', {'user_id': user_id}, room=room)
         print(f'👋 User {user_id} left room {room}')
 
@@ -257,60 +314,162 @@ def handle_caption(data):
         'sender_name': sender_name,
         'timestamp': data.get('timestamp')
     }, room=room, include_self=True)
+    
+    # Signs detected over HTTP (/api/sign/detect) join the sender's sentence too
+    if caption_type == 'sign' and caption and room and room in rooms():
+        _emit_sentence_delta(
+            get_sentence_service().update((room, sender_id), caption, sid=request.sid),
+            room, sender_id, sender_name
+        )
 
 # ===== SIGN LANGUAGE DETECTION VIA SOCKET.IO =====
+def _process_video_frame(frame_data, room, sender_id, sender_name, sid, timestamp, received):
+    """Frame worker job: decode, track and predict one stream frame, then caption it"""
+    timer = get_stage_timer()
+    start = time.perf_counter()
+    try:
+        img_bytes = decode_payload(frame_data)
+    except ValueError:
+        print(f'❌ Invalid frame data from {sender_name}')
+        return
+    timer.record('payload', time.perf_counter() - start)
+    try:
+        future = submit_frame(img_bytes, key=(room, sender_id), sid=sid)
+    except BackendBusy:
+        print(f'⏳ Dropped frame from {sender_name}: inference workers busy')
+        return
+    _on_frame_done(future, room, sender_id, sender_name, sid, timestamp)
+    timer.record('end_to_end', time.perf_counter() - received)
+
+def _on_frame_done(future, room, sender_id, sender_name, sid, timestamp):
+    """Broadcast a finished frame's sign"""
+    try:
+        result = frame_result(future)
+    except (TrackerPoolTimeout, BackendBusy):
+        print(f'⏳ Dropped frame from {sender_name}: hand tracker busy')
+        return
+    except Exception as e:
+        print(f'❌ Error processing video frame: {e}')
+        return
+    
+    if result is None:
+        print(f'❌ Invalid frame data from {sender_name}')
+        return
+    
+    _emit_sign_caption(result, room, sender_id, sender_name, sid, timestamp)
+
+def _emit_sign_caption(result, room, sender_id, sender_name, sid, timestamp):
+    # Uncertain frames have no sign; the stabilizer only lets a sign through
+    # once it is steady and differs from this sender's last caption
+    caption = get_caption_stabilizer().update(
+        (room, sender_id), result['sign'], result['confidence'], sid=sid
+    )
+    if caption:
+        start = time.perf_counter()
+        socketio.emit('receive_caption', {
+            'caption': caption,
+            'type': 'sign',
+            'confidence': result['confidence'],
+            'sender_id': sender_id,
+            'sender_name': sender_name,
+            'timestamp': timestamp
+        }, room=room)
+        get_stage_timer().record('emit', time.perf_counter() - start)
+        
+        print(f'✋ Detected sign: {caption} from user {sender_name}')
+        _emit_sentence_delta(
+            get_sentence_service().update((room, sender_id), caption, sid=sid), room, sender_id, sender_name
+        )
+
+def _emit_sentence_delta(delta, room, sender_id, sender_name):
+    # Only the change goes out; clients rebuild the sentence (see sentence_service)
+    if delta:
+        socketio.emit('sentence_delta', {
+            **delta,
+            'sender_id': sender_id,
+            'sender_name': sender_name
+        }, room=room)
+
+@socketio.on('get_sentence')
+def handle_get_sentence(data):
+    """Send the requester every sentence of a room (on join or after a missed seq)"""
+    room = data.get('room')
+    # Transcripts are private to the room's members
+    if room and room in rooms():
+        emit('sentence_snapshot', {'room': room, 'sentences': get_sentence_service().snapshot(room)})
+
+@socketio.on('clear_sentence')
+def handle_clear_sentence(data):
+    """Start a new sentence for a sender (only the connection signing as them may)"""
+    room = data.get('room')
+    sender_id = data.get('sender_id')
+    if room and room in rooms():
+        _emit_sentence_delta(
+            get_sentence_service().clear((room, sender_id), sid=request.sid),
+            room, sender_id, data.get('sender_name', 'User')
+        )
+
 @socketio.on('video_frame')
 def handle_video_frame(data):
-    """Process video frame for sign language detection"""
+    """
+    Queue a video frame for sign language detection.
+    "frame" is a binary JPEG attachment (bytes) or, from older clients,
+    a base64 data URL. The handler only validates and enqueues; a frame
+    worker decodes, tracks, predicts and emits receive_caption to the room.
+    """
     try:
         room = data.get('room')
         frame_data = data.get('frame')
         sender_id = data.get('sender_id')
         sender_name = data.get('sender_name', 'User')
+        sid = request.sid
+        received = time.perf_counter()
         
-        if not frame_data or not room:
+        if not room or not check_payload(frame_data):
             return
         
-        # Decode base64 frame (same as /predict route)
-        import base64
-        
-        # Remove data URL prefix if present
-        if 'base64,' in frame_data:
-            frame_data = frame_data.split('base64,')[1]
+        # Only this stream's newest frame waits for a frame worker; an older
+        # waiting frame is dropped, so captions never lag behind a backlog
+        accepted = get_frame_scheduler().submit(
+            (room, sender_id),
+            lambda: _process_video_frame(frame_data, room, sender_id, sender_name,
+                                         sid, data.get('timestamp', None), received),
+            sid=sid,
+        )
+        if not accepted:
+            print(f'⏳ Dropped frame from {sender_name}: frame queue full')
         
-        # Decode base64 to image using OpenCV
-        img_bytes = base64.b64decode(frame_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    except Exception as e:
+        print(f'❌ Error processing video frame: {e}')
+        # Don't emit error to avoid spamming client
+
+@socketio.on('landmark_frame')
+def handle_landmark_frame(data):
+    """
+    Sign detection from landmarks tracked on the client.
+    Expects: { room, sender_id, sender_name, landmarks: float32 bytes
+               (frames x hands x 21 x dims), hands: 1, dims: 3, timestamp,
+               fps: capture rate of multi-frame payloads }
+    """
+    try:
+        room = data.get('room')
+        payload = data.get('landmarks')
+        sender_id = data.get('sender_id')
+        sender_name = data.get('sender_name', 'User')
         
-        if frame is None:
-            print(f'❌ Invalid frame data from {sender_name}')
+        if not payload or not room:
             return
         
-        # Process frame through hand tracker
-        result = tracker.process(frame)
-        prediction = "No Hand"
+        points = decode_landmarks(payload, hands=data.get('hands', 1), dims=data.get('dims', 3))
         
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                prediction = predict_sign(hand_landmarks)
-                break  # Only process first hand
-        
-        # Only emit if a sign was detected (not "No Hand")
-        if prediction != "No Hand":
-            emit('receive_caption', {
-                'caption': prediction,
-                'type': 'sign',
-                'sender_id': sender_id,
-                'sender_name': sender_name,
-                'timestamp': data.get('timestamp', None)
-            }, room=room, include_self=True)
-            
-            print(f'✋ Detected sign: {prediction} from user {sender_name}')
+        # All frames in one model call; caption the newest one
+        result = analyze_landmarks(points, key=(room, sender_id), sid=request.sid, fps=data.get('fps'))[-1]
+        _emit_sign_caption(result, room, sender_id, sender_name, request.sid, data.get('timestamp', None))
         
+    except LandmarkPayloadError as e:
+        print(f'❌ Invalid landmarks from {data.get("sender_name", "User")}: {e}')
     except Exception as e:
-        print(f'❌ Error processing video frame: {e}')
-        # Don't emit error to avoid spamming client
+        print(f'❌ Error processing landmark frame: {e}')
 
 if __name__ == "__main__":
     port = int(os.getenv('PORT', 5000))
@@ -318,4 +477,6 @@ if __name__ == "__main__":
     print(f"🔒 Security: HTTPS={os.getenv('FORCE_HTTPS', 'False')}, Rate Limiting=Enabled, CSRF=Enabled", flush=True)
     print(f"📡 Socket.IO enabled for real-time communication", flush=True)
     print(f"🛡️  HTTPOnly Cookies, Security Headers, Input Validation enabled", flush=True)
+    # Accept connections right away; /api/health reports 503 until warm-up ends
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
     socketio.run(app, host="0.0.0.0", port=port, debug=True, use_reloader=False)
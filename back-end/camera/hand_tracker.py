@@ -1,4 +1,11 @@
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
 import cv2
+import numpy as np
+from camera.tracker_profiles import DEFAULT_PROFILE, get_profile
 # Use legacy import for mediapipe 0.10.30+
 try:
     from mediapipe.python.solutions import hands as mp_hands
@@ -10,19 +17,99 @@ except ImportError:
     mp_drawing = mp.solutions.drawing_utils
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, profile=None, roi=False, roi_padding=0.5, roi_min_size=96):
+        settings = get_profile(profile)
+        self.profile = profile or DEFAULT_PROFILE
+        self.max_edge = settings['max_edge']
         self.mp_hands = mp_hands
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.5,  # Lower threshold for better detection
-            min_tracking_confidence=0.5    # Lower threshold for better tracking
+        graph_settings = dict(
+            max_num_hands=settings['max_num_hands'],
+            model_complexity=settings['model_complexity'],
+            min_detection_confidence=settings['min_detection_confidence'],
+            min_tracking_confidence=settings['min_tracking_confidence']
         )
+        self.hands = mp_hands.Hands(static_image_mode=False, **graph_settings)
         self.drawer = mp_drawing
 
+        # ROI-crop tracking, for trackers that follow a single video stream:
+        # the next frame is searched only in a padded box around the last hand.
+        # The crop window moves and rescales from frame to frame, so crops run
+        # through their own static-mode graph; the tracking graph above only
+        # ever sees full frames and keeps its state in frame coordinates.
+        self.roi = roi
+        self.roi_hands = mp_hands.Hands(static_image_mode=True, **graph_settings) if roi else None
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self._roi_box = None
+        self.roi_frames = 0
+        self.roi_misses = 0
+
     def process(self, frame):
+        if self.max_edge and max(frame.shape[:2]) > self.max_edge:
+            # Landmarks are normalized, so a smaller input changes no coordinates
+            scale = self.max_edge / max(frame.shape[:2])
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if self.roi and self._roi_box is not None:
+            result = self._process_roi(frame)
+            if result is not None:
+                return result
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        return self.hands.process(rgb)
+        result = self.hands.process(rgb)
+        if self.roi:
+            self._roi_box = self._next_roi(result, frame.shape)
+        return result
+
+    def _process_roi(self, frame):
+        """Track inside the last hand's box; None when the crop lost the hand"""
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self._roi_box
+        if x1 > width or y1 > height:
+            # Frame size changed
+            self._roi_box = None
+            return None
+
+        self.roi_frames += 1
+        rgb = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+        result = self.roi_hands.process(rgb)
+        if not result.multi_hand_landmarks:
+            self.roi_misses += 1
+            self._roi_box = None
+            return None
+
+        # Map crop-normalized landmarks back to full-frame normalized ones
+        crop_w, crop_h = x1 - x0, y1 - y0
+        for hand in result.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = (x0 + lm.x * crop_w) / width
+                lm.y = (y0 + lm.y * crop_h) / height
+                lm.z = lm.z * crop_w / width
+        self._roi_box = self._next_roi(result, frame.shape)
+        return result
+
+    def _next_roi(self, result, shape):
+        """Padded pixel box around the detected hands, or None to use the full frame"""
+        if not result.multi_hand_landmarks:
+            return None
+        height, width = shape[:2]
+        xs = [lm.x for hand in result.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in result.multi_hand_landmarks for lm in hand.landmark]
+        cx = (min(xs) + max(xs)) / 2 * width
+        cy = (min(ys) + max(ys)) / 2 * height
+        side = max((max(xs) - min(xs)) * width, (max(ys) - min(ys)) * height)
+        half = max(side * (1 + 2 * self.roi_padding), self.roi_min_size) / 2
+
+        x0, x1 = int(max(0, cx - half)), int(min(width, cx + half))
+        y0, y1 = int(max(0, cy - half)), int(min(height, cy + half))
+        # Not worth cropping when the box covers most of the frame
+        if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) > 0.8 * width * height:
+            return None
+        return x0, y0, x1, y1
+
+    def close(self):
+        """Release the MediaPipe graphs"""
+        self.hands.close()
+        if self.roi_hands is not None:
+            self.roi_hands.close()
 
     def draw(self, frame, result):
         if result.multi_hand_landmarks:
@@ -33,3 +120,140 @@ class HandTracker:
                     self.mp_hands.HAND_CONNECTIONS
                 )
         return frame
+
+class TrackerPoolTimeout(TimeoutError):
+    """Raised when no tracker became free within the checkout timeout"""
+
+class HandTrackerPool:
+    """
+    Fixed-size pool of HandTrackers (one MediaPipe graph each).
+
+    A single mp_hands.Hands instance is not thread-safe, so concurrent frames
+    each check out their own tracker. Trackers are created lazily up to
+    `size`; when all are busy, callers wait up to `timeout` seconds.
+    """
+
+    def __init__(self, size=2, timeout=5.0, factory=HandTracker):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._busy_time = 0.0
+
+    def _acquire(self, timeout):
+        try:
+            return self._idle.get_nowait(), False
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._factory(), False
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout), True
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TrackerPoolTimeout(f"No hand tracker free after {timeout:.1f}s")
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a tracker for the duration of a `with` block"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        tracker, waited = self._acquire(timeout)
+        acquired = time.monotonic()
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._wait_time += acquired - start
+            self._max_wait = max(self._max_wait, acquired - start)
+        try:
+            yield tracker
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._busy_time += time.monotonic() - acquired
+            self._idle.put(tracker)
+
+    def process(self, frame, timeout=None):
+        with self.checkout(timeout) as tracker:
+            return tracker.process(frame)
+
+    def warm_up(self):
+        """Create every tracker and run a synthetic frame through each"""
+        while True:
+            # Reserve one slot at a time, as _acquire does, and give it back
+            # if the tracker cannot be built
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            tracker = None
+            try:
+                tracker = self._factory()
+                warm_up_tracker(tracker)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                if tracker is not None:
+                    tracker.close()
+                raise
+            self._idle.put(tracker)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'utilization': self._in_use / self.size,
+                'checkouts': checkouts,
+                'waited': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': (self._wait_time / checkouts * 1000) if checkouts else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+                'busy_seconds': self._busy_time,
+            }
+
+def warm_up_tracker(tracker, width=640, height=480):
+    """Run a synthetic frame through the graph so the first real frame is fast"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    return tracker.process(frame)
+
+# One pool per process, created on first use. MediaPipe graphs own native
+# threads that do not survive fork(), so nothing is built at import time.
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+def get_tracker_pool():
+    """Return this process's HandTrackerPool (HAND_TRACKER_POOL_SIZE, HAND_TRACKER_TIMEOUT)"""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_lock:
+            if _shared_pool is None:
+                _shared_pool = HandTrackerPool(
+                    size=int(os.getenv('HAND_TRACKER_POOL_SIZE', str(min(4, os.cpu_count() or 1)))),
+                    timeout=float(os.getenv('HAND_TRACKER_TIMEOUT', '5.0')),
+                )
+    return _shared_pool
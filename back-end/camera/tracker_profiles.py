@@ -0,0 +1,96 @@
+"""
+Named latency/quality settings for HandTracker.
+
+HAND_TRACKER_PROFILE picks the deployment default; individual rooms can be
+switched with set_room_profile. Use inference/tune_tracker_profiles.py to
+choose from recorded frames on the target instance.
+
+Only rooms with connected members (add_room_member, fed by the Socket.IO
+join/leave/disconnect handlers) can be switched, and a room's profile is
+forgotten when its last member leaves.
+"""
+import os
+import threading
+
+# max_edge: frames are decoded/resized so their longest edge is at most this (0 = full size)
+TRACKER_PROFILES = {
+    'fast': {
+        'model_complexity': 0,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.5,
+        'max_edge': 320,
+        'max_num_hands': 1,
+    },
+    'balanced': {
+        'model_complexity': 1,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.5,
+        'max_edge': 0,
+        'max_num_hands': 1,
+    },
+    'accurate': {
+        'model_complexity': 1,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.6,
+        'max_edge': 0,
+        'max_num_hands': 2,
+    },
+}
+
+DEFAULT_PROFILE = os.getenv('HAND_TRACKER_PROFILE', 'balanced')
+
+_room_profiles = {}
+_room_members = {}      # room -> Socket.IO sids in it
+_room_lock = threading.Lock()
+
+def get_profile(name=None):
+    """Settings of a profile by name (the deployment default for None)"""
+    name = name or DEFAULT_PROFILE
+    if name not in TRACKER_PROFILES:
+        raise ValueError(f"Unknown tracker profile '{name}' (choose from {', '.join(TRACKER_PROFILES)})")
+    return TRACKER_PROFILES[name]
+
+def set_room_profile(room, name):
+    """
+    Use profile `name` for new tracker sessions in `room` (None resets to the
+    default). Raises LookupError when nobody is in the room.
+    """
+    if name is not None:
+        get_profile(name)
+    with _room_lock:
+        if room not in _room_members:
+            raise LookupError(f"Room '{room}' has no connected members")
+        if name is None:
+            _room_profiles.pop(room, None)
+        else:
+            _room_profiles[room] = name
+
+def room_profile(room):
+    with _room_lock:
+        return _room_profiles.get(room, DEFAULT_PROFILE)
+
+def room_exists(room):
+    with _room_lock:
+        return room in _room_members
+
+def add_room_member(room, sid):
+    with _room_lock:
+        _room_members.setdefault(room, set()).add(sid)
+
+def remove_room_member(room, sid):
+    """Drop `sid` from `room`; the room's profile goes with its last member"""
+    with _room_lock:
+        members = _room_members.get(room)
+        if members is None:
+            return
+        members.discard(sid)
+        if not members:
+            del _room_members[room]
+            _room_profiles.pop(room, None)
+
+def remove_member(sid):
+    """Drop a disconnected client from every room"""
+    with _room_lock:
+        rooms = [room for room, members in _room_members.items() if sid in members]
+    for room in rooms:
+        remove_room_member(room, sid)
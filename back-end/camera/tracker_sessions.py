@@ -0,0 +1,209 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from camera.hand_tracker import HandTracker, TrackerPoolTimeout, get_tracker_pool
+from inference.stream_registry import StreamRegistry
+
+class TrackerSession:
+    """One video stream's private HandTracker and the lock that orders its frames"""
+
+    def __init__(self, key, tracker, sid=None, profile=None):
+        self.key = key
+        self.tracker = tracker
+        self.sid = sid
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.frames = 0
+
+class TrackerSessionRegistry:
+    """
+    HandTracker per (room, sender_id) stream.
+
+    static_image_mode=False only pays off when consecutive frames come from
+    the same video, so each stream keeps its own tracking state. Sessions are
+    created lazily, evicted least-recently-used when idle for `idle_timeout`
+    seconds or when `max_sessions` is reached, and closed on disconnect.
+    When every session slot is busy the shared tracker pool is used instead.
+    A session whose tracker profile no longer matches its room's is replaced.
+    """
+
+    def __init__(self, max_sessions=32, idle_timeout=60.0, timeout=5.0,
+                 factory=HandTracker, fallback=None):
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._factory = factory
+        self._fallback = fallback
+        # A session is only evicted while no frame holds its lock; the
+        # registry takes the lock, and the session is closed outside ours
+        self._sessions = StreamRegistry(
+            max_streams=self.max_sessions, idle_timeout=idle_timeout,
+            can_evict=lambda session: session.lock.acquire(blocking=False),
+        )
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = 0
+        self._fallbacks = 0
+        self._roi_frames = 0
+        self._roi_misses = 0
+        self._sweeper = None
+
+    def _get_or_create(self, key, sid, profile=None):
+        now = time.monotonic()
+        victims = []
+        with self._lock:
+            session = self._sessions.get(key, sid, now)
+            if session is not None and session.profile != profile and session.lock.acquire(blocking=False):
+                # The room switched profiles; rebuild the tracker
+                self._sessions.pop(key)
+                victims.append(session)
+                session = None
+            if session is not None:
+                return session, []
+            victims += self._sessions.make_room(now)
+            if len(self._sessions) >= self.max_sessions:
+                return None, victims
+            # Reserve the slot now; the graph is built outside the lock
+            session = TrackerSession(key, None, sid, profile)
+            session.lock.acquire()
+            self._sessions.add(key, session, now)
+            self._created += 1
+
+        try:
+            session.tracker = self._factory(profile=profile)
+        except Exception:
+            with self._lock:
+                if self._sessions.peek(key) is session:
+                    self._sessions.pop(key)
+            session.lock.release()
+            raise
+        session.lock.release()
+        return session, victims
+
+    def _close_sessions(self, sessions):
+        """Close sessions whose locks the caller already holds"""
+        for session in sessions:
+            tracker, session.tracker = session.tracker, None
+            try:
+                if tracker is not None:
+                    with self._lock:
+                        self._roi_frames += getattr(tracker, 'roi_frames', 0)
+                        self._roi_misses += getattr(tracker, 'roi_misses', 0)
+                    tracker.close()
+            finally:
+                session.lock.release()
+
+    @contextmanager
+    def session(self, key, sid=None, profile=None):
+        """Yield the tracker for stream `key`, holding it for this frame only"""
+        while True:
+            session, victims = self._get_or_create(key, sid, profile)
+            self._close_sessions(victims)
+
+            if session is None:
+                with self._lock:
+                    self._fallbacks += 1
+                pool = self._fallback or get_tracker_pool()
+                with pool.checkout(self.timeout) as tracker:
+                    yield tracker
+                return
+
+            if not session.lock.acquire(timeout=self.timeout):
+                raise TrackerPoolTimeout(f"Stream {key} still busy after {self.timeout:.1f}s")
+            if session.tracker is not None:
+                break
+            # Closed while we were waiting for it; start a fresh session
+            session.lock.release()
+
+        try:
+            session.frames += 1
+            session.last_used = time.monotonic()
+            yield session.tracker
+        finally:
+            session.lock.release()
+
+    def process(self, key, frame, sid=None, profile=None):
+        with self.session(key, sid, profile) as tracker:
+            return tracker.process(frame)
+
+    def close(self, key):
+        """Close one stream's session (e.g. when the sender leaves the room)"""
+        with self._lock:
+            session = self._sessions.pop(key)
+        if session is not None:
+            self._close_when_free(session)
+
+    def close_sid(self, sid):
+        """Close every session opened from a Socket.IO connection"""
+        with self._lock:
+            sessions = self._sessions.pop_sid(sid)
+        for session in sessions:
+            self._close_when_free(session)
+        return len(sessions)
+
+    def _close_when_free(self, session):
+        # Wait for an in-flight frame on this stream to finish first
+        session.lock.acquire()
+        with self._lock:
+            self._closed += 1
+        self._close_sessions([session])
+
+    def evict_idle(self):
+        with self._lock:
+            victims = self._sessions.evict_idle()
+        self._close_sessions(victims)
+        return len(victims)
+
+    def start_sweeper(self, interval=None):
+        """Evict idle sessions from a daemon thread even when no new streams arrive"""
+        interval = interval or max(1.0, self.idle_timeout / 2)
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=sweep, name="tracker-session-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def stats(self):
+        with self._lock:
+            trackers = [session.tracker for session in self._sessions.values()]
+            roi_frames = self._roi_frames + sum(getattr(t, 'roi_frames', 0) for t in trackers)
+            roi_misses = self._roi_misses + sum(getattr(t, 'roi_misses', 0) for t in trackers)
+            return {
+                'active': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'created': self._created,
+                'evicted_idle': self._sessions.evicted_idle,
+                'evicted_lru': self._sessions.evicted_lru,
+                'closed': self._closed,
+                'pool_fallbacks': self._fallbacks,
+                'roi_frames': roi_frames,
+                'roi_misses': roi_misses,
+                'roi_hit_rate': (roi_frames - roi_misses) / roi_frames if roi_frames else 0.0,
+            }
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_tracker_sessions():
+    """Return this process's TrackerSessionRegistry (TRACKER_MAX_SESSIONS, TRACKER_SESSION_IDLE, TRACKER_ROI)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TrackerSessionRegistry(
+                    max_sessions=int(os.getenv('TRACKER_MAX_SESSIONS', '32')),
+                    idle_timeout=float(os.getenv('TRACKER_SESSION_IDLE', '60')),
+                    timeout=float(os.getenv('HAND_TRACKER_TIMEOUT', '5.0')),
+                    # Stream trackers search near the last hand first
+                    factory=partial(HandTracker, roi=os.getenv('TRACKER_ROI', 'False') == 'True'),
+                )
+    return _registry
@@ -1,4 +1,5 @@
 import os
+import threading
 import certifi
 from pymongo import MongoClient
 from dotenv import load_dotenv
@@ -6,14 +7,31 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Database:
+    """
+    MongoDB connection, opened on first use rather than at import.
+
+    PyMongo clients are not fork-safe: gunicorn's preload_app imports the
+    app in the parent before forking, so connecting at import would hand
+    every worker the parent's sockets and monitor threads.
+    """
     _instance = None
+    _lock = threading.Lock()
+    _FIELDS = ('client', 'db', 'users', 'call_history', 'online_users')
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
-            cls._instance._initialize()
         return cls._instance
     
+    def __getattr__(self, name):
+        # Only reached while the connection fields are not set yet
+        if name not in self._FIELDS:
+            raise AttributeError(name)
+        with self._lock:
+            if name not in self.__dict__:
+                self._initialize()
+        return self.__dict__[name]
+    
     def _initialize(self):
         try:
             # Python 3.13 has stricter SSL - use workaround for MongoDB Atlas
@@ -56,11 +74,15 @@ class Database:
         return self.db
     
     def close(self):
-        if self.client:
+        if 'client' in self.__dict__ and self.client:
             self.client.close()
 
 # Singleton instance
 db_instance = Database()
 
-# Keep backward compatibility
-db = db_instance.get_db()
+def __getattr__(name):
+    # Keep backward compatibility for `from config.database import db`
+    # without connecting at import
+    if name == 'db':
+        return db_instance.get_db()
+    raise AttributeError(name)
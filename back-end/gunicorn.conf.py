@@ -0,0 +1,32 @@
+"""
+Pre-fork server mode:
+
+    cd back-end && gunicorn -c gunicorn.conf.py api_server:app
+
+The parent process imports the app and loads the sign model once before
+forking, so workers share those pages copy-on-write (the memory-mapped
+forest is shared through the page cache either way). Each worker then builds
+its own MediaPipe graph, opens its own MongoDB connection (the database is
+never touched in the parent; PyMongo clients are not fork-safe) and runs a
+synthetic warm-up frame before it serves requests. More than one worker needs sticky sessions and
+SOCKETIO_MESSAGE_QUEUE (e.g. a Redis URL) for Socket.IO.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '50'))
+timeout = 120
+preload_app = True
+
+def when_ready(server):
+    # Runs in the parent after the app is imported and before any fork
+    from sign_recognition.sign_predictor import preload_model
+    preload_model()
+    server.log.info("Sign model loaded in parent process")
+
+def post_worker_init(worker):
+    # Runs in each worker before it starts accepting connections
+    from api_server import warm_up
+    warm_up()
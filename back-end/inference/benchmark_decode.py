@@ -0,0 +1,92 @@
+"""
+Latency and accuracy of reduced-resolution decode (FRAME_DECODE_MAX_EDGE).
+
+Replays recorded frames through decode -> HandTracker -> score_sign at each
+max edge and compares hands, landmarks and signs with full-resolution decode.
+
+Run from back-end/:  python -m inference.benchmark_decode video.mp4 | image ...
+Without input a synthetic frame is used (latency only).
+"""
+import sys
+import time
+import cv2
+import numpy as np
+
+from camera.hand_tracker import HandTracker
+from inference.frame_pipeline import decode_image, score_result
+from sign_recognition.sign_predictor import preload_model
+
+SETTINGS = (0, 960, 640, 480, 320, 240, 160)
+
+def load_frames(paths, quality=80, limit=300):
+    """JPEG bytes of every image / video frame given on the command line"""
+    images = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is not None:
+            images.append(image)
+            continue
+        capture = cv2.VideoCapture(path)
+        while len(images) < limit:
+            ok, image = capture.read()
+            if not ok:
+                break
+            images.append(image)
+        capture.release()
+    if not paths:
+        rng = np.random.default_rng(0)
+        images = [cv2.GaussianBlur(rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8), (9, 9), 0)] * 50
+    return [cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+            for image in images[:limit]]
+
+def run(frames, max_edge):
+    """Decode/track timings and per-frame (landmarks, sign) for one setting"""
+    tracker = HandTracker()
+    decode_ms, track_ms, outputs = [], [], []
+    shape = None
+    for jpeg in frames:
+        start = time.perf_counter()
+        frame = decode_image(jpeg, max_edge)
+        decoded = time.perf_counter()
+        result = tracker.process(frame)
+        tracked = time.perf_counter()
+        decode_ms.append((decoded - start) * 1000)
+        track_ms.append((tracked - decoded) * 1000)
+        shape = frame.shape
+        landmarks = None
+        if result.multi_hand_landmarks:
+            landmarks = np.array([(lm.x, lm.y) for lm in result.multi_hand_landmarks[0].landmark])
+        outputs.append((landmarks, score_result(result)['sign']))
+    tracker.close()
+    return np.array(decode_ms), np.array(track_ms), outputs, shape
+
+def main():
+    frames = load_frames(sys.argv[1:])
+    if not frames:
+        print("❌ No readable frames")
+        return
+    preload_model()
+
+    print("=" * 60)
+    print("REDUCED-RESOLUTION DECODE")
+    print("=" * 60)
+    print(f"Frames: {len(frames)}\n")
+
+    reference = None
+    for max_edge in SETTINGS:
+        decode_ms, track_ms, outputs, shape = run(frames, max_edge)
+        if reference is None:
+            reference = outputs
+
+        same_hand = np.mean([(a[0] is None) == (b[0] is None) for a, b in zip(outputs, reference)])
+        both = [(a[0], b[0]) for a, b in zip(outputs, reference) if a[0] is not None and b[0] is not None]
+        error = np.mean([np.linalg.norm(a - b, axis=1).mean() for a, b in both]) if both else 0.0
+        same_sign = np.mean([a[1] == b[1] for a, b in zip(outputs, reference)])
+
+        label = "full" if max_edge == 0 else f"{max_edge}px"
+        print(f"{label:>6} -> {shape[1]}x{shape[0]} | decode p50 {np.median(decode_ms):6.2f} ms | "
+              f"track p50 {np.median(track_ms):6.2f} ms p99 {np.percentile(track_ms, 99):6.2f} ms | "
+              f"hand agree {same_hand:.1%} | landmark err {error:.4f} | sign agree {same_sign:.1%}")
+
+if __name__ == "__main__":
+    main()
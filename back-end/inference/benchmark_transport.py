@@ -0,0 +1,90 @@
+"""
+Compare video_frame transports: base64 data URL in JSON vs binary attachment.
+
+Each frame goes through Socket.IO packet decoding as the server receives it,
+then decode_payload -> analyze_frame (decode, track, predict).
+
+Run from back-end/:  python -m inference.benchmark_transport [image ...]
+Without images a synthetic 640x480 frame is used.
+"""
+import sys
+import time
+import base64
+import cv2
+import numpy as np
+from socketio import packet
+
+from camera.hand_tracker import get_tracker_pool
+from inference.frame_pipeline import analyze_frame, decode_payload
+from sign_recognition.sign_predictor import preload_model
+
+def load_frames(paths, quality=60):
+    """JPEG bytes for each image (same quality the web client uses)"""
+    if not paths:
+        rng = np.random.default_rng(0)
+        images = [cv2.GaussianBlur(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8), (9, 9), 0)]
+    else:
+        images = [cv2.imread(path) for path in paths]
+    frames = []
+    for image in images:
+        if image is None:
+            continue
+        ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            frames.append(buf.tobytes())
+    return frames
+
+def encode_event(jpeg, binary):
+    """The video_frame packet(s) as they arrive on the wire"""
+    frame = jpeg if binary else 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode()
+    encoded = packet.Packet(packet.EVENT, data=['video_frame', {
+        'room': 'bench', 'frame': frame, 'sender_id': 'u', 'sender_name': 'Bench', 'timestamp': 0
+    }]).encode()
+    return encoded if isinstance(encoded, list) else [encoded]
+
+def receive(parts):
+    """Server side: parse the packet and get the frame payload back"""
+    pkt = packet.Packet(encoded_packet=parts[0])
+    for attachment in parts[1:]:
+        pkt.add_attachment(attachment)
+    return pkt.data[1]['frame']
+
+def bench(events, repeats):
+    receive_times, total_times = [], []
+    for _ in range(repeats):
+        for parts in events:
+            start = time.perf_counter()
+            img_bytes = decode_payload(receive(parts))
+            received = time.perf_counter()
+            analyze_frame(img_bytes)
+            end = time.perf_counter()
+            receive_times.append(received - start)
+            total_times.append(end - start)
+    return np.array(receive_times) * 1000, np.array(total_times) * 1000
+
+def main():
+    frames = load_frames(sys.argv[1:])
+    if not frames:
+        print("❌ No readable images")
+        return
+    repeats = max(1, 200 // len(frames))
+
+    preload_model()
+    get_tracker_pool().warm_up()
+
+    print("=" * 60)
+    print("VIDEO FRAME TRANSPORT: BASE64 vs BINARY")
+    print("=" * 60)
+    print(f"Frames: {len(frames)} (x{repeats}), mean JPEG size {np.mean([len(f) for f in frames]) / 1024:.1f} KB\n")
+
+    for name, binary in (("base64", False), ("binary", True)):
+        events = [encode_event(jpeg, binary) for jpeg in frames]
+        wire = np.mean([sum(len(part) for part in parts) for parts in events])
+        bench(events[:1], 3)
+        receive_ms, total_ms = bench(events, repeats)
+        print(f"{name:>7}: wire {wire / 1024:7.1f} KB | "
+              f"receive+decode_payload p50 {np.median(receive_ms):.3f} ms | "
+              f"bytes-in -> prediction p50 {np.median(total_ms):.2f} ms, p99 {np.percentile(total_ms, 99):.2f} ms")
+
+if __name__ == "__main__":
+    main()
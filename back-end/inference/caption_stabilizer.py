@@ -0,0 +1,119 @@
+"""
+Per-stream caption debouncing.
+
+Every scored frame of a (room, sender_id) stream goes into a short ring
+buffer of (sign, confidence). A caption is broadcast only when one sign
+holds a confidence-weighted majority of at least `min_frames` buffered
+frames (the whole window by default), or has been the latest prediction
+for `hold` seconds, and differs from the caption last sent for that
+stream. A new stream's first frame therefore never captions on its own. Flicker between similar signs therefore stays on the server
+instead of fanning out to every participant.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+from inference.stream_registry import StreamRegistry
+
+
+class _StreamCaptions:
+    def __init__(self, window, sid=None):
+        self.sid = sid
+        self.recent = deque(maxlen=window)   # (sign or None, weight)
+        self.emitted = None
+        self.current = None
+        self.since = 0.0
+        self.last_used = 0.0
+
+
+class CaptionStabilizer:
+    def __init__(self, window=3, majority=0.6, hold=0.0, max_streams=256, idle_timeout=60.0, min_frames=None):
+        self.window = max(1, int(window))
+        self.min_frames = self.window if min_frames is None else min(self.window, max(1, int(min_frames)))
+        self.majority = float(majority)
+        self.hold = float(hold)
+        self._streams = StreamRegistry(
+            lambda sid: _StreamCaptions(self.window, sid), max_streams, idle_timeout
+        )
+        self._lock = threading.Lock()
+        self._updates = 0
+        self._emitted = 0
+
+    def update(self, key, sign, confidence=None, sid=None):
+        """
+        Add one frame's prediction (sign None for no hand / uncertain).
+
+        Returns the sign to broadcast, or None when nothing should be sent.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._updates += 1
+            stream, _ = self._streams.get_or_create(key, sid, now)
+            weight = 1.0 if confidence is None or sign is None else float(confidence)
+            stream.recent.append((sign, weight))
+            if sign != stream.current:
+                stream.current, stream.since = sign, now
+
+            totals = {}
+            for recent_sign, recent_weight in stream.recent:
+                totals[recent_sign] = totals.get(recent_sign, 0.0) + recent_weight
+            winner = max(totals, key=totals.get)
+            stable = (len(stream.recent) >= self.min_frames
+                      and totals[winner] >= self.majority * sum(totals.values()))
+            if not stable and self.hold > 0 and sign is not None and now - stream.since >= self.hold:
+                winner, stable = sign, True
+
+            if not stable:
+                return None
+            if winner is None:
+                # Hands are down; the same sign may be captioned again later
+                stream.emitted = None
+                return None
+            if winner == stream.emitted:
+                return None
+            stream.emitted = winner
+            self._emitted += 1
+            return winner
+
+    def close(self, key):
+        with self._lock:
+            self._streams.pop(key)
+
+    def close_sid(self, sid):
+        with self._lock:
+            self._streams.pop_sid(sid)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'streams': len(self._streams),
+                'window': self.window,
+                'min_frames': self.min_frames,
+                'majority': self.majority,
+                'hold_seconds': self.hold,
+                'updates': self._updates,
+                'emitted': self._emitted,
+                'suppressed': self._updates - self._emitted,
+            }
+
+
+_stabilizer = None
+_stabilizer_lock = threading.Lock()
+
+def get_caption_stabilizer():
+    """
+    Return this process's CaptionStabilizer (CAPTION_WINDOW, CAPTION_MAJORITY,
+    CAPTION_HOLD, CAPTION_MIN_FRAMES)
+    """
+    global _stabilizer
+    if _stabilizer is None:
+        with _stabilizer_lock:
+            if _stabilizer is None:
+                _stabilizer = CaptionStabilizer(
+                    window=int(os.getenv('CAPTION_WINDOW', '3')),
+                    majority=float(os.getenv('CAPTION_MAJORITY', '0.6')),
+                    hold=float(os.getenv('CAPTION_HOLD', '0')),
+                    min_frames=int(os.getenv('CAPTION_MIN_FRAMES', '0')) or None,
+                )
+    return _stabilizer
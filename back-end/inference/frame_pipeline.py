@@ -0,0 +1,265 @@
+import os
+import time
+import base64
+import struct
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import cv2
+import numpy as np
+
+from camera.hand_tracker import get_tracker_pool
+from camera.tracker_profiles import get_profile, room_profile
+from camera.tracker_sessions import get_tracker_sessions
+from inference.caption_stabilizer import get_caption_stabilizer
+from inference.frame_scheduler import get_frame_scheduler
+from inference.motion_gate import get_motion_gate
+from inference.process_backend import BackendBusy
+from inference.prediction_batcher import get_prediction_batcher
+from inference.stage_timing import get_stage_timer
+from sentence.sentence_service import get_sentence_service
+from sign_recognition.sequence_classifier import apply_sequence, get_sequence_streams
+from sign_recognition.sign_predictor import landmarks_to_array
+
+# 'thread' runs frames in the calling thread; 'process' hands them to
+# worker processes (inference/process_backend.py) to get around the GIL
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'thread')
+
+# Longest edge frames are decoded at; larger JPEGs use OpenCV's reduced
+# (DCT-scaled) decode. 0 decodes at full resolution
+DECODE_MAX_EDGE = int(os.getenv('FRAME_DECODE_MAX_EDGE', '0'))
+
+_REDUCED_MODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Start-of-frame markers (all except DHT, JPG and DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Larger payloads are refused before any work is done
+MAX_FRAME_BYTES = int(os.getenv('MAX_FRAME_BYTES', str(4 * 1024 * 1024)))
+
+_backend = None
+
+def check_payload(frame_data):
+    """Cheap validation of a frame payload before it is queued"""
+    if isinstance(frame_data, str):
+        # base64 is 4/3 the size of the image bytes
+        return 0 < len(frame_data) <= MAX_FRAME_BYTES * 4 // 3 + 64
+    if isinstance(frame_data, (bytes, bytearray, memoryview)):
+        return 0 < memoryview(frame_data).nbytes <= MAX_FRAME_BYTES
+    return False
+
+def decode_payload(frame_data):
+    """
+    Encoded image bytes from a binary payload or a base64 string / data URL.
+
+    Binary payloads (Socket.IO attachments, request bodies) are returned
+    as-is so decode_image can read them without a copy; base64 is kept
+    for older clients.
+    """
+    if isinstance(frame_data, (bytes, bytearray, memoryview)):
+        return frame_data
+    # Remove data URL prefix if present
+    if 'base64,' in frame_data:
+        frame_data = frame_data.split('base64,')[1]
+    return base64.b64decode(frame_data)
+
+def image_size(img_bytes):
+    """(width, height) from a JPEG or PNG header without decoding, else None"""
+    data = memoryview(img_bytes).cast('B')
+    n = len(data)
+    if n >= 24 and data[:8] == b'\x89PNG\r\n\x1a\n':
+        width, height = struct.unpack_from('>II', data, 16)
+        return width, height
+    if n < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Standalone markers carry no length
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack_from('>HH', data, i + 5)
+            return width, height
+        i += 2 + struct.unpack_from('>H', data, i + 2)[0]
+    return None
+
+def decode_mode(img_bytes, max_edge=None):
+    """
+    imdecode flag for a frame: the largest reduction that keeps its longest
+    edge at or above max_edge (FRAME_DECODE_MAX_EDGE by default).
+    """
+    max_edge = DECODE_MAX_EDGE if max_edge is None else max_edge
+    if max_edge <= 0:
+        return cv2.IMREAD_COLOR
+    size = image_size(img_bytes)
+    if size is None:
+        return cv2.IMREAD_COLOR
+    longest = max(size)
+    for factor, mode in _REDUCED_MODES:
+        if longest // factor >= max_edge:
+            return mode
+    return cv2.IMREAD_COLOR
+
+def decode_image(img_bytes, max_edge=None):
+    """
+    Decode JPEG/PNG bytes to a BGR image (None if the data is not an image).
+
+    Large frames are decoded at 1/2, 1/4 or 1/8 scale per decode_mode;
+    landmarks are normalized, so callers see no difference in coordinates.
+    """
+    # frombuffer views the payload in place; imdecode makes the only copy
+    nparr = np.frombuffer(img_bytes, np.uint8)
+    return cv2.imdecode(nparr, decode_mode(img_bytes, max_edge))
+
+def score_result(result):
+    """
+    Score the first hand of a MediaPipe result.
+
+    Returns { "hand": bool, "sign": label or None, "confidence": float or None,
+              "alternatives": [...] }; "sign" is None for uncertain frames.
+    """
+    if not result.multi_hand_landmarks:
+        return {'hand': False, 'sign': None, 'confidence': None, 'alternatives': []}
+    # Batched with frames of other streams being scored at the same time
+    scored = get_prediction_batcher().score(result.multi_hand_landmarks[0])
+    return {
+        'hand': True,
+        'sign': scored['sign'],
+        'confidence': scored['confidence'],
+        'alternatives': scored['alternatives'],
+    }
+
+def analyze_frame(img_bytes, key=None, sid=None, profile=None):
+    """
+    Decode, track and score one encoded frame in this process.
+
+    Frames with a stream `key` use that stream's tracker session, built
+    with tracker `profile`; others borrow a tracker from the pool.
+    Returns None for undecodable data; results carry per-stage "timings"
+    in milliseconds.
+    """
+    start = time.perf_counter()
+    # A profile's max edge takes precedence over FRAME_DECODE_MAX_EDGE
+    frame = decode_image(img_bytes, get_profile(profile)['max_edge'] or None)
+    if frame is None:
+        return None
+    decoded = time.perf_counter()
+    if key is not None:
+        result = get_tracker_sessions().process(key, frame, sid=sid, profile=profile)
+    else:
+        result = get_tracker_pool().process(frame)
+    tracked = time.perf_counter()
+    scored = score_result(result)
+    if key is not None:
+        apply_sequence(scored, key, sid, landmarks_to_array(result.multi_hand_landmarks) if scored['hand'] else None)
+    scored['timings'] = {
+        'decode': (decoded - start) * 1000,
+        'track': (tracked - decoded) * 1000,
+        'predict': (time.perf_counter() - tracked) * 1000,
+    }
+    return scored
+
+def _record_timings(future):
+    if future.exception() is None and future.result() is not None:
+        get_stage_timer().record_all(future.result().get('timings', {}))
+
+def start_backend():
+    """Start the configured execution backend (call once per server process)"""
+    global _backend
+    if INFERENCE_BACKEND == 'process' and _backend is None:
+        from inference.process_backend import ProcessBackend
+        _backend = ProcessBackend(
+            workers=int(os.getenv('INFERENCE_PROCESSES', str(os.cpu_count() or 1))),
+            slot_bytes=int(os.getenv('FRAME_SLOT_BYTES', str(2 * 1024 * 1024))),
+            timeout=float(os.getenv('HAND_TRACKER_TIMEOUT', '5.0')),
+        )
+        _backend.start()
+    return _backend
+
+def submit_frame(img_bytes, key=None, sid=None):
+    """
+    Run analyze_frame on the active backend and return a Future.
+
+    With the process backend the call returns immediately; otherwise the
+    frame is processed inline and the Future is already resolved. Stream
+    frames that barely changed since the last processed one resolve at once
+    to that frame's result (see MotionGate). Streams are tracked with
+    their room's tracker profile.
+    """
+    profile = room_profile(key[0]) if key is not None else None
+    gate = get_motion_gate() if key is not None else None
+    token = None
+    if gate is not None and gate.enabled:
+        skip, value = gate.check(key, img_bytes, sid)
+        if skip:
+            future = Future()
+            future.set_result(value)
+            return future
+        token = value
+
+    if _backend is not None:
+        future = _backend.submit(img_bytes, key=key, sid=sid, profile=profile)
+    else:
+        future = Future()
+        try:
+            future.set_result(analyze_frame(img_bytes, key=key, sid=sid, profile=profile))
+        except Exception as e:
+            future.set_exception(e)
+
+    future.add_done_callback(_record_timings)
+    if token is not None:
+        future.add_done_callback(
+            lambda f: gate.update(key, token, None if f.exception() else f.result())
+        )
+    return future
+
+def frame_result(future):
+    """
+    Wait for a submit_frame Future. Raises BackendBusy when the process
+    backend has not answered within its timeout.
+    """
+    timeout = _backend.timeout if _backend is not None else None
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise BackendBusy(f"No inference result within {timeout:.1f}s")
+
+def close_streams(sid):
+    """Release per-stream tracking state of a disconnected client"""
+    if _backend is not None:
+        _backend.close_sid(sid)
+    get_frame_scheduler().discard_sid(sid)
+    get_tracker_sessions().close_sid(sid)
+    get_motion_gate().close_sid(sid)
+    get_caption_stabilizer().close_sid(sid)
+    get_sequence_streams().close_sid(sid)
+    get_sentence_service().close_sid(sid)
+
+def close_stream(key):
+    get_frame_scheduler().discard(key)
+    if _backend is not None:
+        _backend.close_stream(key)
+    get_tracker_sessions().close(key)
+    get_motion_gate().close(key)
+    get_caption_stabilizer().close(key)
+    get_sequence_streams().close(key)
+    get_sentence_service().close(key)
+
+def backend_stats():
+    if _backend is None:
+        return {'backend': 'thread'}
+    return {'backend': 'process', **_backend.stats()}
@@ -0,0 +1,149 @@
+"""
+Latest-frame-wins scheduling for video streams.
+
+Each (room, sender_id) stream has a single slot holding its newest
+unprocessed frame. A frame that arrives while an older one is still waiting
+replaces it, and the old frame is counted as dropped. A fixed set of worker
+threads drains the slots round-robin, one frame per stream at a time, so
+captions stay current under overload instead of trailing a backlog.
+
+At most `max_waiting` streams may have a frame waiting. When that is
+reached a frame from a new stream is rejected (policy 'reject') or the
+frame that has waited longest is shed to make room (policy 'shed_oldest').
+"""
+import os
+import time
+import threading
+from collections import deque
+
+from inference.stage_timing import get_stage_timer
+
+POLICIES = ('reject', 'shed_oldest')
+
+
+class LatestFrameScheduler:
+    def __init__(self, workers=4, max_waiting=64, policy='shed_oldest'):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}' (choose from {', '.join(POLICIES)})")
+        self.workers = max(1, int(workers))
+        self.max_waiting = max(1, int(max_waiting))
+        self.policy = policy
+        self._slots = {}           # key -> (job, sid, enqueued) of the newest waiting frame
+        self._ready = deque()      # streams with a waiting frame and none running
+        self._running = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._submitted = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._shed = 0
+        self._processed = 0
+        self._failed = 0
+
+    def _start(self):
+        # Caller holds self._cond
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"frame-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, key, job, sid=None):
+        """
+        Queue `job` (a callable) as stream `key`'s newest frame.
+
+        Returns False when the frame was rejected because the queue is full.
+        """
+        with self._cond:
+            if not self._threads:
+                self._start()
+            self._submitted += 1
+            if key in self._slots:
+                # An older frame was still waiting; it will never be processed
+                self._dropped += 1
+            else:
+                if len(self._slots) >= self.max_waiting:
+                    if self.policy == 'reject':
+                        self._rejected += 1
+                        return False
+                    self._remove(min(self._slots, key=lambda k: self._slots[k][2]))
+                    self._shed += 1
+                if key not in self._running:
+                    self._ready.append(key)
+            self._slots[key] = (job, sid, time.monotonic())
+            self._cond.notify()
+            return True
+
+    def _remove(self, key):
+        # Caller holds self._cond
+        if self._slots.pop(key, None) is not None and key in self._ready:
+            self._ready.remove(key)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                key = self._ready.popleft()
+                job, _, enqueued = self._slots.pop(key)
+                self._running.add(key)
+            get_stage_timer().record('queue_wait', time.monotonic() - enqueued)
+
+            failed = False
+            try:
+                job()
+            except Exception as e:
+                failed = True
+                print(f"❌ Frame job for {key} failed: {e}", flush=True)
+            finally:
+                with self._cond:
+                    self._running.discard(key)
+                    self._processed += 1
+                    self._failed += failed
+                    # A newer frame arrived meanwhile; the stream rejoins at the back
+                    if key in self._slots:
+                        self._ready.append(key)
+                        self._cond.notify()
+
+    def discard(self, key):
+        """Forget a stream's waiting frame (e.g. the sender left the room)"""
+        with self._cond:
+            self._remove(key)
+
+    def discard_sid(self, sid):
+        with self._cond:
+            for key in [key for key, (_, owner, _) in self._slots.items() if owner == sid]:
+                self._remove(key)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'max_waiting': self.max_waiting,
+                'policy': self.policy,
+                'waiting_streams': len(self._slots),
+                'running': len(self._running),
+                'submitted': self._submitted,
+                'processed': self._processed,
+                'dropped': self._dropped,
+                'rejected': self._rejected,
+                'shed': self._shed,
+                'failed': self._failed,
+                'drop_rate': self._dropped / self._submitted if self._submitted else 0.0,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_frame_scheduler():
+    """Return this process's LatestFrameScheduler (FRAME_WORKERS, FRAME_QUEUE_DEPTH, FRAME_QUEUE_POLICY)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LatestFrameScheduler(
+                    workers=int(os.getenv('FRAME_WORKERS', str(min(4, os.cpu_count() or 1)))),
+                    max_waiting=int(os.getenv('FRAME_QUEUE_DEPTH', '64')),
+                    policy=os.getenv('FRAME_QUEUE_POLICY', 'shed_oldest'),
+                )
+    return _scheduler
@@ -0,0 +1,94 @@
+"""
+Landmark-only ingestion: clients that run hand tracking themselves send
+landmarks instead of images, so the server skips decode and MediaPipe.
+
+Wire format: little-endian float32 values laid out as
+frames x hands x 21 landmarks x dims (dims 3 = x, y, z or 2 = x, y),
+in MediaPipe's normalized image coordinates. Sent as raw bytes (Socket.IO
+binary attachment / octet-stream body) or as a base64 string.
+"""
+import os
+import time
+import base64
+import numpy as np
+
+from sign_recognition.sequence_classifier import apply_sequence
+from sign_recognition.sign_predictor import score_sign_batch
+
+NUM_LANDMARKS = 21
+MAX_FRAMES = int(os.getenv('LANDMARK_MAX_FRAMES', '32'))
+
+_DTYPE = np.dtype('<f4')
+
+
+class LandmarkPayloadError(ValueError):
+    """Raised for landmark payloads with the wrong size, shape or values"""
+
+
+def decode_landmarks(payload, hands=1, dims=3):
+    """
+    Parse a landmark payload into a (frames, hands, 21, dims) float32 array.
+
+    Raw bytes are viewed in place (no copy); strings are base64-decoded.
+    """
+    try:
+        hands, dims = int(hands), int(dims)
+    except (TypeError, ValueError):
+        raise LandmarkPayloadError("hands and dims must be integers")
+    if hands not in (1, 2):
+        raise LandmarkPayloadError(f"hands must be 1 or 2, got {hands}")
+    if dims not in (2, 3):
+        raise LandmarkPayloadError(f"dims must be 2 or 3, got {dims}")
+
+    if isinstance(payload, str):
+        try:
+            payload = base64.b64decode(payload, validate=True)
+        except ValueError:
+            raise LandmarkPayloadError("Landmarks are not valid base64")
+    if not isinstance(payload, (bytes, bytearray, memoryview)):
+        raise LandmarkPayloadError("Landmarks must be binary float32 data")
+
+    frame_bytes = hands * NUM_LANDMARKS * dims * _DTYPE.itemsize
+    size = memoryview(payload).nbytes
+    if size == 0 or size % frame_bytes:
+        raise LandmarkPayloadError(
+            f"Payload of {size} bytes is not a whole number of {hands}x{NUM_LANDMARKS}x{dims} float32 frames"
+        )
+    frames = size // frame_bytes
+    if frames > MAX_FRAMES:
+        raise LandmarkPayloadError(f"At most {MAX_FRAMES} frames per payload, got {frames}")
+
+    points = np.frombuffer(payload, dtype=_DTYPE).reshape(frames, hands, NUM_LANDMARKS, dims)
+    if not np.isfinite(points).all():
+        raise LandmarkPayloadError("Landmarks contain NaN or infinite values")
+    return points
+
+
+def analyze_landmarks(points, key=None, sid=None, fps=None):
+    """
+    Score every frame of a decoded payload with one model call.
+
+    Returns one { "hand", "sign", "confidence", "alternatives" } dict per
+    frame, the same shape as frame_pipeline.score_result. Frames of a
+    stream `key` also go, in order, through its sequence window; a payload
+    of several frames needs the client's capture `fps` to place them in
+    time (without it only the newest frame is used).
+    """
+    results = [
+        {
+            'hand': True,
+            'sign': scored['sign'],
+            'confidence': scored['confidence'],
+            'alternatives': scored['alternatives'],
+        }
+        for scored in score_sign_batch(points)
+    ]
+    if key is not None and points.shape[-1] == 3:
+        now = time.monotonic()
+        fps = float(fps or 0)
+        if fps > 0:
+            for index, (frame, scored) in enumerate(zip(points, results)):
+                apply_sequence(scored, key, sid, frame, now - (len(points) - 1 - index) / fps)
+        else:
+            apply_sequence(results[-1], key, sid, points[-1], now)
+    return results
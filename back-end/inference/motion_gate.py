@@ -0,0 +1,121 @@
+"""
+Motion gate in front of stream inference.
+
+A frame is compared with its stream's last processed frame on a tiny
+grayscale thumbnail (decoded at 1/8 scale, so this costs far less than a
+full decode). When almost nothing changed, the stream's previous result is
+reused and decode, tracking and prediction are skipped.
+"""
+import os
+import threading
+import cv2
+import numpy as np
+
+from inference.stream_registry import StreamRegistry
+
+
+class _StreamMotion:
+    """Last processed thumbnail of one stream and the result it produced"""
+
+    def __init__(self, sid=None):
+        self.sid = sid
+        self.last_used = 0.0
+        self.thumb = None
+        self.result = None
+        self.ready = False
+        self.skips = 0
+
+
+class MotionGate:
+    """
+    Per-stream change detector with bounded memory.
+
+    A frame counts as unchanged when fewer than `threshold` (a fraction) of
+    its thumbnail cells moved by more than `pixel_delta` grey levels. At
+    most `max_skips` frames in a row reuse a result, and only the
+    `max_streams` most recently active streams are remembered.
+    """
+
+    def __init__(self, threshold=0.005, pixel_delta=12, size=(40, 30), max_skips=10, max_streams=64):
+        self.threshold = float(threshold)
+        self.pixel_delta = int(pixel_delta)
+        self.size = tuple(size)
+        self.max_skips = int(max_skips)
+        self._streams = StreamRegistry(_StreamMotion, max_streams)
+        self._lock = threading.Lock()
+        self._gated = 0
+        self._processed = 0
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    def _thumbnail(self, img_bytes):
+        gray = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if gray is None:
+            return None
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def check(self, key, img_bytes, sid=None):
+        """
+        Returns (True, previous result) when the frame can be skipped, else
+        (False, token); pass the token and the new result to update().
+        """
+        thumb = self._thumbnail(img_bytes)
+        with self._lock:
+            state, created = self._streams.get_or_create(key, sid)
+            if not created:
+                if (thumb is not None and state.ready and state.skips < self.max_skips
+                        and (np.abs(thumb - state.thumb) > self.pixel_delta).mean() < self.threshold):
+                    state.skips += 1
+                    self._gated += 1
+                    return True, state.result
+
+            self._processed += 1
+            state.thumb, state.result, state.ready, state.skips = thumb, None, False, 0
+            return False, thumb
+
+    def update(self, key, token, result):
+        """Record the result of a processed frame (ignored if a newer frame superseded it)"""
+        if token is None or result is None:
+            return
+        with self._lock:
+            state = self._streams.peek(key)
+            if state is not None and state.thumb is token:
+                state.result, state.ready = result, True
+
+    def close(self, key):
+        with self._lock:
+            self._streams.pop(key)
+
+    def close_sid(self, sid):
+        with self._lock:
+            self._streams.pop_sid(sid)
+
+    def stats(self):
+        with self._lock:
+            total = self._gated + self._processed
+            return {
+                'enabled': self.enabled,
+                'streams': len(self._streams),
+                'gated': self._gated,
+                'processed': self._processed,
+                'gated_rate': self._gated / total if total else 0.0,
+            }
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+def get_motion_gate():
+    """Return this process's MotionGate (MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_SKIP; threshold 0 disables)"""
+    global _gate
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = MotionGate(
+                    threshold=float(os.getenv('MOTION_GATE_THRESHOLD', '0.005')),
+                    max_skips=int(os.getenv('MOTION_GATE_MAX_SKIP', '10')),
+                    max_streams=int(os.getenv('TRACKER_MAX_SESSIONS', '32')) * 2,
+                )
+    return _gate
@@ -0,0 +1,145 @@
+"""
+Cross-stream micro-batching for sign prediction.
+
+Frame workers of different streams hand their landmarks to one batcher
+thread, which waits up to `window` seconds after the first row (or until
+`max_batch` rows) and scores the whole batch with one score_sign_batch
+call. Each caller gets its own row's result back.
+
+The window adapts to load: a lone caller is scored at once, and once the
+batch holds as many rows as the previous one it is flushed without waiting
+out the window.
+"""
+import os
+import time
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+from sign_recognition.sign_predictor import landmarks_to_array, score_sign, score_sign_batch
+
+# Batch sizes are reported in these buckets (upper bounds)
+_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class PredictionBatcher:
+    def __init__(self, window=0.002, max_batch=32):
+        self.window = float(window)
+        self.max_batch = max(1, int(max_batch))
+        self._pending = []        # (points, enqueued, future)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._started = None
+        self._last_size = 0
+        self._batches = 0
+        self._rows = 0
+        self._largest = 0
+        self._score_time = 0.0
+        self._buckets = {}        # bucket -> [batches, rows, total wait]
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_batch > 1
+
+    def score(self, hand):
+        """score_sign for one hand, batched with concurrent callers"""
+        if not self.enabled:
+            return score_sign(hand)
+        future = Future()
+        points = landmarks_to_array([hand])
+        with self._cond:
+            if self._thread is None:
+                self._started = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self._thread.start()
+            self._pending.append((points, time.monotonic(), future))
+            self._cond.notify()
+        return future.result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = self._pending[0][1] + self.window
+                target = self.max_batch
+                if self._last_size > 1:
+                    # Expect about as much company as last time
+                    target = min(self.max_batch, self._last_size)
+                elif len(self._pending) == 1:
+                    deadline = 0
+                while len(self._pending) < target:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._last_size = len(batch)
+
+            start = time.monotonic()
+            try:
+                results = score_sign_batch(np.concatenate([points for points, _, _ in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.monotonic()
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+            self._record(batch, start, finished)
+
+    def _record(self, batch, start, finished):
+        size = len(batch)
+        bucket = next((b for b in _BUCKETS if size <= b), _BUCKETS[-1])
+        wait = sum(start - enqueued for _, enqueued, _ in batch)
+        with self._cond:
+            self._batches += 1
+            self._rows += size
+            self._largest = max(self._largest, size)
+            self._score_time += finished - start
+            counts = self._buckets.setdefault(bucket, [0, 0, 0.0])
+            counts[0] += 1
+            counts[1] += size
+            counts[2] += wait
+
+    def stats(self):
+        """Throughput and, per batch size, the queueing delay rows paid for it"""
+        with self._cond:
+            batches, rows = self._batches, self._rows
+            elapsed = time.monotonic() - self._started if self._started else 0.0
+            return {
+                'enabled': self.enabled,
+                'window_ms': self.window * 1000,
+                'max_batch': self.max_batch,
+                'batches': batches,
+                'rows': rows,
+                'avg_batch': rows / batches if batches else 0.0,
+                'largest_batch': self._largest,
+                'score_ms_per_row': self._score_time / rows * 1000 if rows else 0.0,
+                'rows_per_second': rows / elapsed if elapsed else 0.0,
+                'by_batch_size': {
+                    f"<={bucket}": {
+                        'batches': count,
+                        'rows': bucket_rows,
+                        'avg_wait_ms': wait / bucket_rows * 1000,
+                    }
+                    for bucket, (count, bucket_rows, wait) in sorted(self._buckets.items())
+                },
+            }
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_prediction_batcher():
+    """Return this process's PredictionBatcher (PREDICT_BATCH_WINDOW_MS, PREDICT_BATCH_SIZE; window 0 disables)"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = PredictionBatcher(
+                    window=float(os.getenv('PREDICT_BATCH_WINDOW_MS', '2')) / 1000,
+                    max_batch=int(os.getenv('PREDICT_BATCH_SIZE', '32')),
+                )
+    return _batcher
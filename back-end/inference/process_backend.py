@@ -0,0 +1,301 @@
+"""
+Process-pool execution backend for frame decode, hand tracking and prediction.
+
+Each worker process owns its MediaPipe graphs and sign model, so Python-side
+work no longer serialises on the server's GIL. Encoded frames reach workers
+through pre-allocated shared-memory slots: the parent copies the bytes in once
+and only (slot, length) travels through the request queue. Frames of one
+stream always go to the same worker, which keeps its tracker session warm.
+A worker that dies fails its in-flight frames and is replaced.
+"""
+import os
+import sys
+import atexit
+import queue
+import zlib
+import itertools
+import threading
+import contextlib
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_for_exit
+from concurrent.futures import Future
+
+
+class BackendBusy(TimeoutError):
+    """Raised when a worker had no free frame slot (or result) within the timeout"""
+
+
+class WorkerDied(RuntimeError):
+    """Set on the frames a worker process was handling when it exited"""
+
+
+def _worker_main(slot_names, requests, results):
+    # One tracker per worker for stateless frames; streams get sessions.
+    # A worker scores one frame at a time, so there is nothing to batch
+    os.environ['HAND_TRACKER_POOL_SIZE'] = '1'
+    os.environ['PREDICT_BATCH_WINDOW_MS'] = '0'
+
+    from camera.hand_tracker import get_tracker_pool
+    from camera.tracker_sessions import get_tracker_sessions
+    from inference.frame_pipeline import analyze_frame
+    from sign_recognition.sequence_classifier import get_sequence_streams
+    from sign_recognition.sign_predictor import preload_model, start_model_watcher
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    preload_model()
+    # Each worker has its own copy of the model, so each watches for retrains
+    if os.getenv('MODEL_HOT_RELOAD', 'True') == 'True':
+        start_model_watcher()
+    get_tracker_pool().warm_up()
+    results.put(('ready', None, None))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        op = message[0]
+        if op == 'close':
+            get_tracker_sessions().close(message[1])
+            get_sequence_streams().close(message[1])
+            continue
+        if op == 'close_sid':
+            get_tracker_sessions().close_sid(message[1])
+            get_sequence_streams().close_sid(message[1])
+            continue
+
+        _, request_id, slot, payload, key, sid, profile = message
+        # Read straight out of shared memory; imdecode makes the only copy
+        data = slots[slot].buf[:payload] if slot is not None else payload
+        try:
+            results.put((request_id, analyze_frame(data, key, sid, profile), None))
+        except Exception as e:
+            results.put((request_id, None, f"{type(e).__name__}: {e}"))
+        finally:
+            del data
+
+    for shm in slots:
+        shm.close()
+
+
+@contextlib.contextmanager
+def _without_main_module():
+    """
+    Hide the parent's main script from spawned children.
+
+    spawn normally re-imports the script that started the server (as
+    __mp_main__) in every worker; for `python api_server.py` that would
+    build another Flask app and MongoDB client per worker. Workers only
+    need _worker_main, which they import from this module.
+    """
+    main = sys.modules['__main__']
+    saved = {name: main.__dict__[name] for name in ('__file__', '__spec__') if name in main.__dict__}
+    main.__dict__.pop('__file__', None)
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        main.__dict__.update(saved)
+        if '__spec__' not in saved:
+            del main.__spec__
+
+
+class ProcessBackend:
+    def __init__(self, workers=2, slot_bytes=2 * 1024 * 1024, slots_per_worker=4, timeout=5.0):
+        self.workers = max(1, int(workers))
+        self.slot_bytes = int(slot_bytes)
+        self.slots_per_worker = max(1, int(slots_per_worker))
+        self.timeout = timeout
+
+        self._ctx = mp.get_context('spawn')
+        self._processes = []
+        self._requests = []
+        self._results = None
+        self._slots = []
+        self._free = []
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._round_robin = itertools.count()
+        self._ready = threading.Event()
+        self._ready_count = 0
+        self._collector = None
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._busy = 0
+        self._inline = 0
+        self._restarts = 0
+        self._stopping = False
+
+    def start(self):
+        # MediaPipe and model state must not be forked, so workers are spawned
+        self._results = self._ctx.Queue()
+        for worker in range(self.workers):
+            slots = [shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+                     for _ in range(self.slots_per_worker)]
+            free = queue.Queue()
+            for index in range(len(slots)):
+                free.put(index)
+            self._slots.append(slots)
+            self._free.append(free)
+            self._requests.append(None)
+            self._processes.append(None)
+            self._spawn(worker)
+
+        self._collector = threading.Thread(target=self._collect, name="sign-inference-results", daemon=True)
+        self._collector.start()
+        atexit.register(self.shutdown)
+        print(f"🧵 Started {self.workers} inference worker processes", flush=True)
+
+    def _spawn(self, worker):
+        # A fresh request queue, so a replacement never sees frames already failed
+        requests = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=([shm.name for shm in self._slots[worker]], requests, self._results),
+            name="sign-inference-worker",
+            daemon=True,
+        )
+        with _without_main_module():
+            process.start()
+        self._requests[worker] = requests
+        self._processes[worker] = process
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def _worker_for(self, key):
+        if key is None:
+            return next(self._round_robin) % self.workers
+        return zlib.crc32(repr(key).encode()) % self.workers
+
+    def submit(self, img_bytes, key=None, sid=None, profile=None):
+        """Queue an encoded frame; the Future resolves to analyze_frame's result"""
+        worker = self._worker_for(key)
+        length = len(img_bytes)
+        slot = None
+        payload = length
+
+        if length <= self.slot_bytes:
+            try:
+                slot = self._free[worker].get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._busy += 1
+                raise BackendBusy(f"Inference worker {worker} busy for {self.timeout:.1f}s")
+            self._slots[worker][slot].buf[:length] = img_bytes
+        else:
+            # Oversized frame: fall back to sending the bytes through the queue
+            payload = bytes(img_bytes)
+            with self._lock:
+                self._inline += 1
+
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            # Under the lock so a worker replacement sees either both or neither
+            self._pending[request_id] = (future, worker, slot)
+            self._submitted += 1
+            self._requests[worker].put(('frame', request_id, slot, payload, key, sid, profile))
+        return future
+
+    def _collect(self):
+        while True:
+            try:
+                request_id, result, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                self._replace_dead()
+                continue
+            except (EOFError, OSError, ValueError):
+                return
+            if request_id == 'ready':
+                with self._lock:
+                    self._ready_count += 1
+                    if self._ready_count >= self.workers:
+                        self._ready.set()
+                continue
+
+            with self._lock:
+                # Unknown when its worker died (and the frame was failed) first
+                entry = self._pending.pop(request_id, None)
+                if entry is not None:
+                    if error is None:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+            if entry is None:
+                continue
+            future, worker, slot = entry
+            if slot is not None:
+                self._free[worker].put(slot)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(error))
+            self._replace_dead()
+
+    def _replace_dead(self):
+        """Fail the frames of workers that exited, free their slots and respawn them"""
+        processes = [process for process in self._processes if process is not None]
+        if self._stopping or not wait_for_exit([process.sentinel for process in processes], timeout=0):
+            return
+        for worker, process in enumerate(self._processes):
+            if process is None or process.is_alive():
+                continue
+            with self._lock:
+                if self._stopping:
+                    return
+                lost = [(request_id, entry) for request_id, entry in self._pending.items() if entry[1] == worker]
+                for request_id, _ in lost:
+                    del self._pending[request_id]
+                self._failed += len(lost)
+                self._restarts += 1
+                old = self._requests[worker]
+                self._spawn(worker)
+            old.cancel_join_thread()
+            old.close()
+            print(f"💥 Inference worker {worker} exited with code {process.exitcode}; "
+                  f"failed {len(lost)} frames and restarted it", flush=True)
+            for _, (future, _, slot) in lost:
+                if slot is not None:
+                    self._free[worker].put(slot)
+                future.set_exception(WorkerDied(f"Inference worker {worker} exited with code {process.exitcode}"))
+
+    def close_stream(self, key):
+        with self._lock:
+            self._requests[self._worker_for(key)].put(('close', key))
+
+    def close_sid(self, sid):
+        with self._lock:
+            for requests in self._requests:
+                requests.put(('close_sid', sid))
+
+    def shutdown(self):
+        with self._lock:
+            self._stopping = True
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+        for slots in self._slots:
+            for shm in slots:
+                shm.close()
+                shm.unlink()
+        self._processes, self._requests, self._slots = [], [], []
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'ready': self._ready.is_set(),
+                'alive': sum(process.is_alive() for process in self._processes),
+                'restarts': self._restarts,
+                'in_flight': len(self._pending),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'busy_rejections': self._busy,
+                'oversized_frames': self._inline,
+            }
@@ -0,0 +1,51 @@
+"""
+Per-stage latency of the frame path (queue wait, decode, track, predict, emit).
+
+Each stage keeps its most recent samples in a fixed-size window, so memory
+stays bounded and percentiles follow current load.
+"""
+import threading
+from collections import deque
+import numpy as np
+
+
+class StageTimer:
+    def __init__(self, window=512):
+        self.window = int(window)
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+            samples.append(seconds * 1000)
+            self._counts[stage] += 1
+
+    def record_all(self, timings):
+        """Record a {stage: milliseconds} dict (as returned with frame results)"""
+        for stage, ms in timings.items():
+            self.record(stage, ms / 1000)
+
+    def stats(self):
+        with self._lock:
+            snapshot = {stage: (np.array(samples), self._counts[stage])
+                        for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                'count': count,
+                'p50_ms': float(np.percentile(samples, 50)),
+                'p95_ms': float(np.percentile(samples, 95)),
+                'max_ms': float(samples.max()),
+            }
+            for stage, (samples, count) in snapshot.items() if len(samples)
+        }
+
+
+_timer = StageTimer()
+
+def get_stage_timer():
+    return _timer
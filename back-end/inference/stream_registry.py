@@ -0,0 +1,110 @@
+"""
+Bounded per-stream state shared by the per-(room, sender_id) stages.
+
+Streams are kept in least-recently-used order. Making room for a new one
+first drops streams idle for `idle_timeout` seconds (oldest first), then
+the least recently used while `max_streams` are held. Stream objects carry
+`sid` (the Socket.IO connection feeding them, for close_sid on disconnect)
+and `last_used`.
+
+A registry is not locked itself: its owner already holds a lock around
+the stream's own state and calls in under it.
+"""
+import time
+from collections import OrderedDict
+
+
+class StreamRegistry:
+    def __init__(self, factory=None, max_streams=256, idle_timeout=None, can_evict=None):
+        """
+        `factory(sid)` builds a stream for get_or_create. `can_evict(stream)`
+        may refuse to evict a stream that is in use (default: always evict).
+        """
+        self._factory = factory
+        self.max_streams = max(1, int(max_streams))
+        self.idle_timeout = idle_timeout
+        self._can_evict = can_evict
+        self._streams = OrderedDict()
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def __len__(self):
+        return len(self._streams)
+
+    def values(self):
+        return list(self._streams.values())
+
+    def items(self):
+        return list(self._streams.items())
+
+    def peek(self, key):
+        """The stream of `key` (or None) without marking it used"""
+        return self._streams.get(key)
+
+    def get(self, key, sid=None, now=None):
+        """The stream of `key` marked as just used (None if unknown)"""
+        stream = self._streams.get(key)
+        if stream is not None:
+            self._streams.move_to_end(key)
+            if sid is not None:
+                stream.sid = sid
+            stream.last_used = time.monotonic() if now is None else now
+        return stream
+
+    def add(self, key, stream, now=None):
+        """Insert `stream` as the most recently used; call make_room first"""
+        stream.last_used = time.monotonic() if now is None else now
+        self._streams[key] = stream
+        self._streams.move_to_end(key)
+
+    def get_or_create(self, key, sid=None, now=None):
+        """Returns (stream, created); a new stream may evict others"""
+        now = time.monotonic() if now is None else now
+        stream = self.get(key, sid, now)
+        if stream is not None:
+            return stream, False
+        self.make_room(now)
+        stream = self._factory(sid)
+        self.add(key, stream, now)
+        return stream, True
+
+    def _evictable(self, stream):
+        return self._can_evict is None or self._can_evict(stream)
+
+    def evict_idle(self, now=None):
+        """Remove streams idle for idle_timeout seconds; returns them"""
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic() if now is None else now
+        evicted = []
+        for key, stream in list(self._streams.items()):
+            if now - stream.last_used < self.idle_timeout:
+                break
+            if self._evictable(stream):
+                del self._streams[key]
+                evicted.append(stream)
+        self.evicted_idle += len(evicted)
+        return evicted
+
+    def make_room(self, now=None):
+        """Evict idle streams, then LRU ones until a new stream fits; returns them"""
+        evicted = self.evict_idle(now)
+        while len(self._streams) >= self.max_streams:
+            for key, stream in self._streams.items():
+                if self._evictable(stream):
+                    del self._streams[key]
+                    evicted.append(stream)
+                    self.evicted_lru += 1
+                    break
+            else:
+                # Every stream is in use
+                break
+        return evicted
+
+    def pop(self, key):
+        return self._streams.pop(key, None)
+
+    def pop_sid(self, sid):
+        """Remove and return every stream fed from connection `sid`"""
+        keys = [key for key, stream in self._streams.items() if stream.sid == sid]
+        return [self._streams.pop(key) for key in keys]
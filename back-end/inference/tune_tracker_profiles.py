@@ -0,0 +1,70 @@
+"""
+Pick a hand tracker profile from data.
+
+Replays recorded frames through every profile in TRACKER_PROFILES
+(decode -> HandTracker -> score_sign), reports p50/p99 latency and agreement
+with the 'accurate' profile, and recommends the fastest profile whose sign
+agreement is at least TUNE_MIN_AGREEMENT (default 0.95).
+
+Run from back-end/ on the target instance:
+    python -m inference.tune_tracker_profiles video.mp4 | image ...
+"""
+import os
+import sys
+import time
+import numpy as np
+
+from camera.hand_tracker import HandTracker
+from camera.tracker_profiles import TRACKER_PROFILES
+from inference.benchmark_decode import load_frames
+from inference.frame_pipeline import decode_image, score_result
+from sign_recognition.sign_predictor import preload_model
+
+REFERENCE = 'accurate'
+
+def replay(frames, profile):
+    """Per-frame latency (ms), hand presence and sign for one profile"""
+    tracker = HandTracker(profile=profile, roi=os.getenv('TRACKER_ROI', 'False') == 'True')
+    max_edge = TRACKER_PROFILES[profile]['max_edge'] or None
+    times, hands, signs = [], [], []
+    for jpeg in frames:
+        start = time.perf_counter()
+        result = tracker.process(decode_image(jpeg, max_edge))
+        scored = score_result(result)
+        times.append((time.perf_counter() - start) * 1000)
+        hands.append(scored['hand'])
+        signs.append(scored['sign'])
+    tracker.close()
+    return np.array(times), np.array(hands), np.array(signs, dtype=object)
+
+def main():
+    frames = load_frames(sys.argv[1:])
+    if not frames:
+        print("❌ No readable frames")
+        return
+    min_agreement = float(os.getenv('TUNE_MIN_AGREEMENT', '0.95'))
+    preload_model()
+
+    print("=" * 60)
+    print("HAND TRACKER PROFILE TUNING")
+    print("=" * 60)
+    print(f"Frames: {len(frames)}, reference profile: {REFERENCE}\n")
+
+    runs = {name: replay(frames, name) for name in TRACKER_PROFILES}
+    _, ref_hands, ref_signs = runs[REFERENCE]
+
+    candidates = []
+    for name, (times, hands, signs) in runs.items():
+        hand_agree = (hands == ref_hands).mean()
+        sign_agree = (signs == ref_signs).mean()
+        p50, p99 = np.median(times), np.percentile(times, 99)
+        print(f"{name:>9}: p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | "
+              f"hand agree {hand_agree:6.1%} | sign agree {sign_agree:6.1%}")
+        if sign_agree >= min_agreement:
+            candidates.append((p50, name))
+
+    best = min(candidates)[1] if candidates else REFERENCE
+    print(f"\n✅ Recommended: HAND_TRACKER_PROFILE={best} (sign agreement >= {min_agreement:.0%})")
+
+if __name__ == "__main__":
+    main()
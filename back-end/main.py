@@ -1,18 +1,18 @@
 import cv2
-import pyttsx3
 
 from camera.hand_tracker import HandTracker
 from sign_recognition.sign_predictor import predict_sign
 from sentence.sentence_builder import SentenceBuilder
 from ui.caption_overlay import draw_caption
+from ui.speech_worker import SpeechWorker
 
 def main():
     cap = cv2.VideoCapture(0)
     tracker = HandTracker()
     builder = SentenceBuilder()
 
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 150)
+    # Speaks on its own thread so the camera loop never waits for audio
+    speech = SpeechWorker(rate=150)
 
     last_spoken = ""
 
@@ -33,8 +33,7 @@ def main():
         sentence = builder.update(sign)
 
         if sentence != last_spoken and len(sentence.split()) >= 2:
-            engine.say(sentence)
-            engine.runAndWait()
+            speech.say(sentence)
             last_spoken = sentence
 
         frame = draw_caption(frame, sign, sentence)
@@ -45,10 +44,13 @@ def main():
             break
         if key == ord('c'):
             builder.clear()
+            speech.clear()
             last_spoken = ""
 
     cap.release()
     cv2.destroyAllWindows()
+    speech.stop(timeout=5)
+    print(f"🔊 Speech: {speech.stats()}")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,6 @@
 import sys
 import cv2
 import threading
-import pyttsx3
 from PyQt5.QtWidgets import (
     QApplication, QLabel, QPushButton, QVBoxLayout, QWidget
 )
@@ -12,6 +11,7 @@ from camera.hand_tracker import HandTracker
 from sign_recognition.sign_predictor import predict_sign
 from sentence.sentence_builder import SentenceBuilder
 from ui.caption_overlay import draw_caption
+from ui.speech_worker import SpeechWorker
 
 class SignLanguageApp(QWidget):
     def __init__(self):
@@ -38,8 +38,8 @@ class SignLanguageApp(QWidget):
         self.cap = None
         self.tracker = HandTracker()
         self.builder = SentenceBuilder()
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
+        # Speaks on its own thread so update_frame never waits for audio
+        self.speech = SpeechWorker(rate=150)
         self.running = False
         self.last_spoken = ""
 
@@ -58,6 +58,7 @@ class SignLanguageApp(QWidget):
 
     def clear_sentence(self):
         self.builder.clear()
+        self.speech.clear()
         self.last_spoken = ""
 
     def update_frame(self):
@@ -77,8 +78,7 @@ class SignLanguageApp(QWidget):
             sentence = self.builder.update(sign)
 
             if sentence != self.last_spoken and len(sentence.split()) >= 2:
-                self.engine.say(sentence)
-                self.engine.runAndWait()
+                self.speech.say(sentence)
                 self.last_spoken = sentence
 
             frame = draw_caption(frame, sign, sentence)
@@ -97,4 +97,8 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = SignLanguageApp()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    window.stop_camera()
+    window.speech.stop(timeout=5)
+    print(f"🔊 Speech: {window.speech.stats()}")
+    sys.exit(exit_code)
@@ -1,73 +1,195 @@
 from flask import Blueprint, request, jsonify
-from flask_socketio import emit
-import cv2
-import numpy as np
-import base64
-from camera.hand_tracker import HandTracker
-from sign_recognition.sign_predictor import predict_sign
+from camera.hand_tracker import TrackerPoolTimeout, get_tracker_pool
+from camera.tracker_profiles import DEFAULT_PROFILE, TRACKER_PROFILES, room_exists, room_profile, set_room_profile
+from camera.tracker_sessions import get_tracker_sessions
+from inference.caption_stabilizer import get_caption_stabilizer
+from inference.frame_pipeline import backend_stats, decode_payload, frame_result, submit_frame
+from inference.frame_scheduler import get_frame_scheduler
+from inference.landmark_pipeline import LandmarkPayloadError, analyze_landmarks, decode_landmarks
+from inference.motion_gate import get_motion_gate
+from inference.prediction_batcher import get_prediction_batcher
+from inference.process_backend import BackendBusy
+from inference.stage_timing import get_stage_timer
+from sentence.sentence_service import get_sentence_service
+from sign_recognition.sequence_classifier import get_sequence_streams
+from sign_recognition.sign_predictor import get_cascade_stats, get_prediction_cache_stats
+from utils.auth import token_required
 
 sign_bp = Blueprint('sign', __name__)
 
-# Initialize hand tracker
-tracker = HandTracker()
-
 @sign_bp.route('/detect', methods=['POST', 'OPTIONS'])
 def detect_sign():
     """
     Detect sign language from video frame
-    Expects: { "frame": "base64_encoded_image", "room_id": "room123", "user_id": "user123" }
-    Returns: { "sign": "HELLO", "confidence": 0.95 }
+    Expects: multipart/form-data with a "frame" JPEG file, a raw image/jpeg
+             (or octet-stream) body, or the older JSON form
+             { "frame": "base64_encoded_image", "room_id": "room123", "user_id": "user123" }
+    Returns: { "sign": "HELLO", "confidence": 0.95, "alternatives": [...] }
+    Frames below SIGN_MIN_CONFIDENCE come back with "detected": false.
     """
     # Handle preflight OPTIONS request
     if request.method == 'OPTIONS':
         return '', 204
     
     try:
-        data = request.get_json()
+        if 'frame' in request.files:
+            data = request.form
+            frame_data = request.files['frame'].read()
+        elif request.is_json:
+            data = request.get_json()
+            frame_data = data.get('frame', '')
+        else:
+            data = request.args
+            frame_data = request.get_data(cache=False)
         
-        # Decode base64 image
-        frame_data = data.get('frame', '')
         if not frame_data:
             return jsonify({'error': 'No frame data provided'}), 400
         
-        # Remove data URL prefix if present
-        if 'base64,' in frame_data:
-            frame_data = frame_data.split('base64,')[1]
+        # Binary bodies pass straight through; base64 is decoded
+        img_bytes = decode_payload(frame_data)
         
-        # Decode base64 to image
-        img_bytes = base64.b64decode(frame_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode, track and predict (in a worker process with INFERENCE_BACKEND=process)
+        try:
+            result = frame_result(submit_frame(img_bytes))
+        except (TrackerPoolTimeout, BackendBusy):
+            return jsonify({'error': 'Server busy, try again'}), 503
         
-        if frame is None:
+        if result is None:
             return jsonify({'error': 'Invalid frame data'}), 400
         
-        # Process frame with hand tracker
-        result = tracker.process(frame)
-        
-        if result.multi_hand_landmarks:
-            # Get first hand detected
-            hand_landmarks = result.multi_hand_landmarks[0]
-            
-            # Predict sign
-            detected_sign = predict_sign(hand_landmarks)
-            
-            print(f'✋ Sign detected: {detected_sign}', flush=True)
-            
+        if not result['hand']:
             return jsonify({
-                'sign': detected_sign,
-                'detected': True,
-                'timestamp': data.get('timestamp', None)
+                'sign': None,
+                'detected': False,
+                'message': 'No hand detected'
             })
-        else:
+        
+        detected_sign = result['sign']
+        if detected_sign is None:
             return jsonify({
                 'sign': None,
                 'detected': False,
-                'message': 'No hand detected'
+                'confidence': result['confidence'],
+                'alternatives': result['alternatives'],
+                'message': 'Low confidence'
             })
+        
+        print(f'✋ Sign detected: {detected_sign} ({result["confidence"]:.2f})', flush=True)
+        
+        return jsonify({
+            'sign': detected_sign,
+            'detected': True,
+            'confidence': result['confidence'],
+            'alternatives': result['alternatives'],
+            'timestamp': data.get('timestamp', None)
+        })
     
     except Exception as e:
         print(f"❌ Error in sign detection: {str(e)}", flush=True)
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
+
+@sign_bp.route('/landmarks', methods=['POST', 'OPTIONS'])
+def detect_from_landmarks():
+    """
+    Detect signs from landmarks tracked on the client (no image decode or MediaPipe)
+    Expects: application/octet-stream body of float32 frames x hands x 21 x dims,
+             with ?hands=1&dims=3 (defaults), or
+             { "landmarks": "base64 float32", "hands": 1, "dims": 3 }
+    Returns: { "frames": 2, "results": [{ "sign": "HELLO", "detected": true, "confidence": 0.95, ... }] }
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        if request.is_json:
+            data = request.get_json()
+            payload = data.get('landmarks', '')
+            hands, dims = data.get('hands', 1), data.get('dims', 3)
+        else:
+            payload = request.get_data(cache=False)
+            hands, dims = request.args.get('hands', 1), request.args.get('dims', 3)
+        
+        if not payload:
+            return jsonify({'error': 'No landmark data provided'}), 400
+        
+        try:
+            points = decode_landmarks(payload, hands=hands, dims=dims)
+        except LandmarkPayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results = [
+            {
+                'sign': result['sign'],
+                'detected': result['sign'] is not None,
+                'confidence': result['confidence'],
+                'alternatives': result['alternatives']
+            }
+            for result in analyze_landmarks(points)
+        ]
+        return jsonify({'frames': len(results), 'results': results})
+    
+    except Exception as e:
+        print(f"❌ Error in landmark sign detection: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 500
+
+@sign_bp.route('/profile', methods=['GET', 'OPTIONS'])
+def tracker_profile():
+    """
+    Hand tracker profile of a room (latency vs. quality)
+    GET ?room_id=room123 -> { "room_id", "profile", "default", "profiles": {...} }
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    return _profile_response(request.args.get('room_id'))
+
+@sign_bp.route('/profile', methods=['POST'])
+@token_required
+def set_tracker_profile():
+    """
+    Switch a room's hand tracker profile
+    Expects: { "room_id": "room123", "profile": "fast" | "balanced" | "accurate" | null }
+    New tracker sessions in the room use the profile; null restores the default.
+    The room must have connected members; its profile is dropped when the last leaves.
+    """
+    data = request.get_json() or {}
+    room = data.get('room_id')
+    if not room:
+        return jsonify({'error': 'room_id is required'}), 400
+    try:
+        set_room_profile(room, data.get('profile'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    print(f"🎛️  Room {room} tracker profile: {room_profile(room)} (set by user {request.user_id})", flush=True)
+    return _profile_response(room)
+
+def _profile_response(room):
+    return jsonify({
+        'room_id': room,
+        'profile': room_profile(room) if room else DEFAULT_PROFILE,
+        'active': room_exists(room) if room else False,
+        'default': DEFAULT_PROFILE,
+        'profiles': TRACKER_PROFILES
+    })
+
+@sign_bp.route('/stats', methods=['GET'])
+def sign_stats():
+    """Inference counters for tuning (cascade hit rate, ...)"""
+    return jsonify({
+        'cascade': get_cascade_stats(),
+        'prediction_cache': get_prediction_cache_stats(),
+        'tracker_pool': get_tracker_pool().stats(),
+        'tracker_sessions': get_tracker_sessions().stats(),
+        'inference': backend_stats(),
+        'frame_scheduler': get_frame_scheduler().stats(),
+        'stages': get_stage_timer().stats(),
+        'motion_gate': get_motion_gate().stats(),
+        'prediction_batcher': get_prediction_batcher().stats(),
+        'captions': get_caption_stabilizer().stats(),
+        'sequence': get_sequence_streams().stats(),
+        'sentences': get_sentence_service().stats()
+    })
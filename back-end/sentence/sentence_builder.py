@@ -1,21 +1,48 @@
 import time
+from collections import deque
 
 class SentenceBuilder:
-    def __init__(self):
-        self.sentence = []
+    """
+    Turns a stream of detected signs into a sentence.
+
+    A sign is added when it differs from the last one and at least
+    `min_gap` seconds (monotonic) have passed. Only the newest `max_words`
+    words are kept; the text is updated in place instead of re-joined.
+    """
+
+    def __init__(self, min_gap=1.2, max_words=50):
+        self.min_gap = min_gap
+        self.words = deque(maxlen=max_words)
+        self.text = ""
         self.last_sign = ""
-        self.last_time = time.time()
+        self.last_time = float("-inf")    # the first sign is never too early
 
-    def update(self, sign):
-        now = time.time()
+    def add(self, sign, now=None):
+        """
+        Add `sign` if it is due. Returns None, or the change as
+        { "append": word, "drop": number of oldest words removed }.
+        """
+        now = time.monotonic() if now is None else now
+        if not sign or sign == self.last_sign or sign == "UNKNOWN":
+            return None
+        if now - self.last_time <= self.min_gap:
+            return None
 
-        if sign != self.last_sign and sign != "UNKNOWN":
-            if now - self.last_time > 1.2:
-                self.sentence.append(sign)
-                self.last_sign = sign
-                self.last_time = now
+        drop = 0
+        if len(self.words) == self.words.maxlen:
+            # The oldest word and its separator leave the text
+            self.text = self.text[len(self.words[0]) + 1:]
+            drop = 1
+        self.words.append(sign)
+        self.text = f"{self.text} {sign}" if self.text else sign
+        self.last_sign = sign
+        self.last_time = now
+        return {'append': sign, 'drop': drop}
 
-        return " ".join(self.sentence)
+    def update(self, sign):
+        self.add(sign)
+        return self.text
 
     def clear(self):
-        self.sentence = []
+        self.words.clear()
+        self.text = ""
@@ -0,0 +1,119 @@
+"""
+Server-side sentences, one per (room, sender_id) stream.
+
+Captioned signs of a stream feed its SentenceBuilder; each change is
+broadcast as a delta ({ seq, append, drop, reset }) rather than the whole
+sentence, so payloads stay one word long however long a call runs.
+Clients apply deltas in seq order: "reset" empties their copy, "drop"
+removes that many signs from the front, "append" adds a sign. A client
+that joins late or misses a seq asks for a snapshot.
+
+Sentences keep at most `max_words` words; streams are bounded LRU and
+dropped after `idle_timeout` seconds without a sign.
+"""
+import os
+import time
+import threading
+
+from inference.stream_registry import StreamRegistry
+from sentence.sentence_builder import SentenceBuilder
+
+
+class _StreamSentence:
+    def __init__(self, min_gap, max_words, sid=None):
+        self.builder = SentenceBuilder(min_gap=min_gap, max_words=max_words)
+        self.sid = sid
+        self.seq = 0
+        self.last_used = 0.0
+
+
+class SentenceService:
+    def __init__(self, min_gap=1.2, max_words=50, max_streams=256, idle_timeout=300.0):
+        self.min_gap = float(min_gap)
+        self.max_words = max(1, int(max_words))
+        self._streams = StreamRegistry(
+            lambda sid: _StreamSentence(self.min_gap, self.max_words, sid), max_streams, idle_timeout
+        )
+        self._lock = threading.Lock()
+        self._deltas = 0
+
+    def update(self, key, sign, sid=None):
+        """
+        Add a captioned sign to stream `key`'s sentence.
+
+        Returns the delta to broadcast, or None when the sentence is
+        unchanged. The first delta of a new (or evicted) stream resets.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stream, created = self._streams.get_or_create(key, sid, now)
+            change = stream.builder.add(sign, now)
+            if change is None:
+                return None
+            stream.seq += 1
+            self._deltas += 1
+            return {'seq': stream.seq, 'reset': created, **change}
+
+    def clear(self, key, sid=None):
+        """
+        Empty stream `key`'s sentence; returns the reset delta (None if
+        unknown). With `sid`, only a stream fed from that connection is cleared.
+        """
+        with self._lock:
+            stream = self._streams.peek(key)
+            if stream is None or (sid is not None and stream.sid != sid):
+                return None
+            stream.builder.clear()
+            stream.seq += 1
+            self._deltas += 1
+            return {'seq': stream.seq, 'reset': True, 'append': None, 'drop': 0}
+
+    def snapshot(self, room):
+        """
+        Current sentences of a room: [{ "sender_id", "seq", "words", "text" }].
+        "words" holds one entry per sign (a sign may contain spaces, e.g.
+        "I LOVE YOU"); "drop" in later deltas counts these entries.
+        """
+        with self._lock:
+            return [
+                {'sender_id': sender_id, 'seq': stream.seq, 'words': list(stream.builder.words),
+                 'text': stream.builder.text}
+                for (stream_room, sender_id), stream in self._streams.items()
+                if stream_room == room
+            ]
+
+    def close(self, key):
+        with self._lock:
+            self._streams.pop(key)
+
+    def close_sid(self, sid):
+        with self._lock:
+            self._streams.pop_sid(sid)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'streams': len(self._streams),
+                'max_words': self.max_words,
+                'min_gap_seconds': self.min_gap,
+                'deltas': self._deltas,
+                'evicted': self._streams.evicted_idle + self._streams.evicted_lru,
+                'words': sum(len(stream.builder.words) for stream in self._streams.values()),
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_sentence_service():
+    """Return this process's SentenceService (SENTENCE_MIN_GAP, SENTENCE_MAX_WORDS, SENTENCE_IDLE_TIMEOUT)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SentenceService(
+                    min_gap=float(os.getenv('SENTENCE_MIN_GAP', '1.2')),
+                    max_words=int(os.getenv('SENTENCE_MAX_WORDS', '50')),
+                    idle_timeout=float(os.getenv('SENTENCE_IDLE_TIMEOUT', '300')),
+                )
+    return _service
@@ -0,0 +1,123 @@
+"""
+Cheap first inference stage in front of the forest.
+
+Built from the training arrays: per-class centroids plus a KD-tree over a
+pruned set of "safe" samples (ones whose neighbours all share their label).
+A frame is answered here only when the nearest centroid clearly wins and its
+nearest samples agree with it; everything else falls through to the forest.
+
+cascade.npz records a fingerprint of the model.pkl it was built next to;
+the predictor ignores a cascade whose fingerprint does not match.
+"""
+import threading
+import numpy as np
+from sklearn.neighbors import KDTree
+
+
+class SignCascade:
+    def __init__(self, centroids, samples, sample_labels, labels,
+                 max_ratio=0.6, k=10, min_agreement=0.9, radius=None, fingerprint=""):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_labels = np.asarray(sample_labels, dtype=np.int64)
+        self.labels = np.asarray(labels)
+        self.max_ratio = float(max_ratio)
+        self.k = int(min(k, len(self.samples)))
+        self.min_agreement = float(min_agreement)
+        # Frames farther than this from every kept sample are out of distribution
+        self.radius = float(radius) if radius is not None else np.inf
+        self.n_features = self.centroids.shape[1]
+        self.fingerprint = str(fingerprint)
+        self.tree = KDTree(self.samples)
+
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def query(self, X):
+        """
+        Try to classify the rows of X.
+
+        Returns (label indices, agreement, hit mask); rows where hit is False
+        must be sent to the forest.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = len(X)
+
+        centroid_dist = np.linalg.norm(X[:, np.newaxis, :] - self.centroids[np.newaxis], axis=2)
+        nearest_two = np.argsort(centroid_dist, axis=1)[:, :2]
+        d1 = centroid_dist[np.arange(n_rows), nearest_two[:, 0]]
+        d2 = centroid_dist[np.arange(n_rows), nearest_two[:, 1]]
+        clear_centroid = d1 <= self.max_ratio * d2
+
+        dist, idx = self.tree.query(X, k=self.k)
+        neighbour_labels = self.sample_labels[idx]
+        winner = nearest_two[:, 0]
+        agreement = (neighbour_labels == winner[:, np.newaxis]).mean(axis=1)
+
+        hit = clear_centroid & (agreement >= self.min_agreement) & (dist[:, 0] <= self.radius)
+
+        with self._lock:
+            self.lookups += n_rows
+            self.hits += int(hit.sum())
+        return winner, agreement, hit
+
+    def stats(self):
+        with self._lock:
+            lookups, hits = self.lookups, self.hits
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+def build_cascade(X, y, k=10, max_per_class=100, max_ratio=0.6, min_agreement=0.9):
+    """Build a SignCascade from training features X and string labels y."""
+    X = np.asarray(X, dtype=np.float32)
+    labels, y_idx = np.unique(np.asarray(y), return_inverse=True)
+    centroids = np.stack([X[y_idx == c].mean(axis=0) for c in range(len(labels))])
+
+    # Keep only samples whose k nearest neighbours all share their label
+    tree = KDTree(X)
+    dist, idx = tree.query(X, k=min(k + 1, len(X)))
+    safe = (y_idx[idx[:, 1:]] == y_idx[:, np.newaxis]).all(axis=1)
+
+    keep = []
+    for c in range(len(labels)):
+        members = np.flatnonzero(safe & (y_idx == c))
+        if len(members) > max_per_class:
+            members = members[np.linspace(0, len(members) - 1, max_per_class).astype(int)]
+        keep.append(members)
+    keep = np.concatenate(keep)
+
+    # Twice the typical nearest-neighbour spacing bounds "inside the data"
+    radius = 2.0 * float(np.percentile(dist[:, 1], 95))
+
+    return SignCascade(centroids, X[keep], y_idx[keep], labels,
+                       max_ratio=max_ratio, k=k, min_agreement=min_agreement, radius=radius)
+
+
+def save_cascade(cascade, path, fingerprint=None):
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            centroids=cascade.centroids,
+            samples=cascade.samples,
+            sample_labels=cascade.sample_labels,
+            labels=cascade.labels.astype(str),
+            params=np.array([cascade.max_ratio, cascade.k, cascade.min_agreement, cascade.radius]),
+            fingerprint=np.array(fingerprint if fingerprint is not None else cascade.fingerprint),
+        )
+
+
+def load_cascade(path):
+    with np.load(path, allow_pickle=False) as data:
+        max_ratio, k, min_agreement, radius = data["params"].tolist()
+        # Files written before fingerprints existed match no model
+        fingerprint = str(data["fingerprint"]) if "fingerprint" in data.files else ""
+        return SignCascade(
+            data["centroids"], data["samples"], data["sample_labels"], data["labels"],
+            max_ratio=max_ratio, k=int(k), min_agreement=min_agreement, radius=radius,
+            fingerprint=fingerprint,
+        )
@@ -0,0 +1,100 @@
+import os
+import time
+import pickle
+import numpy as np
+
+from forest_engine import compare_models, compile_forest, forest_nbytes, load_forest, model_fingerprint, pack_forest, save_forest
+
+def load_npy_dataset(dataset_dir):
+    X, y = [], []
+    for fname in sorted(os.listdir(dataset_dir)):
+        if not fname.lower().endswith(".npy"):
+            continue
+        arr = np.load(os.path.join(dataset_dir, fname))
+        if arr.ndim == 2 and arr.shape[1] > 0:
+            X.append(arr)
+            y.extend([os.path.splitext(fname)[0].upper()] * len(arr))
+    if not X:
+        return np.empty((0, 0)), np.array(y)
+    return np.concatenate(X), np.array(y)
+
+def time_per_frame(predict, X, repeats=200):
+    rows = X[:1]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(rows)
+    return (time.perf_counter() - start) / repeats
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    model_path = os.path.join(script_dir, "model.pkl")
+    forest_path = os.path.join(script_dir, "model_forest")
+    packed_path = os.path.join(script_dir, "model_packed")
+    dataset_dir = os.path.join(script_dir, "dataset")
+
+    print("=" * 60)
+    print("COMPILING MODEL FOR ARRAY-BACKED INFERENCE")
+    print("=" * 60)
+
+    if not os.path.isfile(model_path):
+        print(f"❌ Model file not found: {model_path}")
+        return
+
+    start = time.perf_counter()
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    pickle_load_time = time.perf_counter() - start
+    # Silence joblib progress output while benchmarking sklearn
+    if hasattr(model, "verbose"):
+        model.verbose = 0
+
+    # Recorded in the headers so the server can tell the forest matches model.pkl
+    fingerprint = model_fingerprint(model_path)
+    forest = compile_forest(model)
+    print(f"\nTrees: {forest.n_estimators}")
+    print(f"Nodes: {len(forest.feature)}")
+    print(f"Max depth: {forest.max_depth}")
+
+    X, y = load_npy_dataset(dataset_dir)
+    if len(X) and X.shape[1] == forest.n_features_in_:
+        expected = model.predict(X)
+        compiled = forest.predict(X)
+        mismatches = int((expected != compiled).sum())
+        print(f"\nVerified on {len(X)} samples from {len(set(y))} classes: {mismatches} mismatches")
+        if mismatches:
+            print("❌ Compiled forest disagrees with sklearn; not saving.")
+            return
+
+        sklearn_time = time_per_frame(model.predict, X, repeats=20)
+        compiled_time = time_per_frame(forest.predict, X)
+        print(f"Per-frame latency: sklearn {sklearn_time * 1e6:.0f} µs, compiled {compiled_time * 1e6:.0f} µs")
+    else:
+        print("\n⚠️  No matching .npy dataset found; skipping verification.")
+
+    save_forest(forest, forest_path, fingerprint=fingerprint)
+    print(f"\n✓ Compiled model saved: {forest_path}")
+
+    start = time.perf_counter()
+    mapped = load_forest(forest_path)
+    mmap_load_time = time.perf_counter() - start
+    if len(X) and X.shape[1] == mapped.n_features_in_ and (mapped.predict(X) != forest.predict(X)).any():
+        print("❌ Memory-mapped model disagrees with the in-memory one.")
+        return
+    print(f"Load time: pickle {pickle_load_time * 1e3:.1f} ms, memory-mapped {mmap_load_time * 1e3:.1f} ms")
+
+    packed = pack_forest(forest)
+    print("\nQuantized model (float16 thresholds, packed indices):")
+    print(f"  Size: model.pkl {os.path.getsize(model_path) / 1024:.0f} KB, "
+          f"compiled {forest_nbytes(forest) / 1024:.0f} KB, packed {forest_nbytes(packed) / 1024:.0f} KB")
+    if len(X) and X.shape[1] == packed.n_features_in_:
+        report = compare_models(model, packed, X, y)
+        print(f"  Accuracy on {report['samples']} bundled samples: "
+              f"model.pkl {report['reference_accuracy'] * 100:.2f}%, "
+              f"packed {report['candidate_accuracy'] * 100:.2f}% "
+              f"(delta {report['accuracy_delta'] * 100:+.2f} pts, {report['disagreements']} disagreements)")
+    save_forest(packed, packed_path, fingerprint=fingerprint)
+    print(f"✓ Packed model saved: {packed_path} (enable with SIGN_MODEL_PACKED=True)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Array-backed inference engine for trained RandomForestClassifier models.
+
+The sklearn forest is flattened into a handful of contiguous NumPy arrays
+(one global node table shared by every tree) and evaluated by walking all
+trees for a whole batch of rows at once, one depth level per step.
+
+On disk a compiled forest is a directory holding one raw .npy file per array
+plus header.json (feature size, labels, array file names, and the
+fingerprint of the model.pkl it was compiled from). Arrays are opened
+with mmap_mode='r', so loading is nearly free and every worker process shares
+the same pages through the OS page cache.
+
+pack_forest() derives a quantized PackedForest from a CompiledForest:
+float16 thresholds, per-tree node indices and feature ids in the smallest
+unsigned type that fits, and leaf probabilities stored as uint8 (1/255 steps).
+"""
+import os
+import json
+import uuid
+import hashlib
+import numpy as np
+
+FORMAT_VERSION = 1
+HEADER_NAME = "header.json"
+_ARRAY_NAMES = ("feature", "threshold", "children", "value_row", "leaf_proba", "roots")
+
+# Below this many rows a full vote is faster than early exit: walking a
+# forest costs a fixed number of NumPy calls per depth level, so skipping
+# trees only pays once a batch is large.
+EARLY_EXIT_MIN_ROWS = 128
+# Slack for the early-exit margin test: float sums, and packed leaves
+# rounded to 1/255 steps, can make one tree's votes sum to slightly over 1
+_MARGIN_EPS = 1e-6
+
+
+class CompiledForest:
+    """Flattened forest that predicts exactly like the sklearn model it came from."""
+
+    engine = "compiled"
+
+    def __init__(self, feature, threshold, children, value_row, leaf_proba,
+                 roots, classes, n_features_in, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        # Interleaved (right, left) pairs: children[2 * node + go_left]
+        self.children = children
+        self.value_row = value_row
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features_in)
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def _validate(self, X):
+        # sklearn evaluates trees on float32 input; match it for identical splits
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}"
+            )
+        return X
+
+    def _walk(self, X, roots):
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_features)[np.newaxis, :]
+        nodes = np.repeat(roots[:, np.newaxis], n_rows, axis=1)
+
+        # Leaves point to themselves, so at most max_depth steps are needed
+        for _ in range(self.max_depth):
+            values = flat.take(row_offsets + self.feature.take(nodes))
+            go_left = values <= self.threshold.take(nodes)
+            next_nodes = self.children.take(2 * nodes + go_left)
+            if np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+        return nodes
+
+    def apply(self, X):
+        """Return the (n_trees, n_rows) global leaf index reached by every row."""
+        return self._walk(self._validate(X), self.roots)
+
+    def _leaf_votes(self, leaves):
+        """Summed class probabilities of (n_trees, n_rows) leaves, per row."""
+        return self.leaf_proba.take(self.value_row.take(leaves), axis=0).sum(axis=0)
+
+    def predict_proba(self, X):
+        return self._leaf_votes(self.apply(X)) / self.n_estimators
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def vote(self, X, early_exit=True, min_rows=EARLY_EXIT_MIN_ROWS):
+        """
+        Accumulate tree votes, optionally stopping early for settled rows.
+
+        With early_exit and at least `min_rows` rows, the first n_trees//2+1
+        trees vote for every row; rows whose leading class is then ahead of
+        the runner-up by more than the remaining trees could add are done,
+        and only the others walk the rest of the forest. Returns (vote
+        fractions over the trees evaluated, number of trees evaluated) per row.
+        """
+        X = self._validate(X)
+        n_rows = X.shape[0]
+        n_trees = self.n_estimators
+        if not early_exit or n_rows < min_rows:
+            votes = self._leaf_votes(self._walk(X, self.roots)).astype(np.float64)
+            return votes / n_trees, np.full(n_rows, n_trees, dtype=np.int64)
+
+        # A tree adds at most 1 to the margin, so no winner is settled before
+        # a majority of trees has voted. A second walk costs as much per
+        # depth level as the first, so there is a single checkpoint.
+        split = n_trees // 2 + 1
+        votes = self._leaf_votes(self._walk(X, self.roots[:split])).astype(np.float64)
+        trees_used = np.full(n_rows, split, dtype=np.int64)
+        remaining = n_trees - split
+        if remaining:
+            top_two = np.partition(votes, -2, axis=1)[:, -2:]
+            undecided = np.flatnonzero(top_two[:, 1] - top_two[:, 0] <= remaining + _MARGIN_EPS)
+            if len(undecided):
+                votes[undecided] += self._leaf_votes(self._walk(X[undecided], self.roots[split:]))
+                trees_used[undecided] = n_trees
+        return votes / trees_used[:, np.newaxis], trees_used
+
+
+class PackedForest(CompiledForest):
+    """
+    Quantized forest read straight from its packed arrays.
+
+    Node indices are local to each tree (roots holds each tree's offset into
+    the node table), so they fit in uint8/uint16 for realistic tree sizes.
+    Predictions can differ slightly from the original model; see
+    compile_model.py for the accuracy report.
+    """
+
+    engine = "packed"
+
+    def _walk(self, X, roots):
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_features)[np.newaxis, :]
+        offsets = roots.astype(np.int64)[:, np.newaxis]
+        nodes = np.zeros((len(roots), n_rows), dtype=np.int64)
+
+        for _ in range(self.max_depth):
+            index = offsets + nodes
+            values = flat.take(row_offsets + self.feature.take(index))
+            go_left = values <= self.threshold.take(index)
+            next_nodes = self.children.take(2 * index + go_left)
+            if np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+        return offsets + nodes
+
+    def _leaf_votes(self, leaves):
+        counts = self.leaf_proba.take(self.value_row.take(leaves), axis=0).sum(axis=0, dtype=np.int64)
+        return counts / 255.0
+
+
+def _smallest_uint(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def pack_forest(forest):
+    """Quantize a CompiledForest into the compact PackedForest layout."""
+    roots = np.asarray(forest.roots, dtype=np.int64)
+    n_nodes = len(forest.feature)
+    sizes = np.diff(np.append(roots, n_nodes))
+    tree_of_node = np.repeat(np.arange(len(roots)), sizes)
+
+    local_children = np.asarray(forest.children, dtype=np.int64) - np.repeat(roots[tree_of_node], 2)
+    n_leaves = len(forest.leaf_proba)
+
+    return PackedForest(
+        feature=np.asarray(forest.feature).astype(_smallest_uint(int(np.max(forest.feature)))),
+        threshold=np.asarray(forest.threshold).astype(np.float16),
+        children=local_children.astype(_smallest_uint(int(sizes.max()) - 1)),
+        value_row=np.asarray(forest.value_row).astype(_smallest_uint(n_leaves - 1)),
+        leaf_proba=np.rint(np.asarray(forest.leaf_proba) * 255).astype(np.uint8),
+        roots=roots.astype(_smallest_uint(n_nodes)),
+        classes=forest.classes_,
+        n_features_in=forest.n_features_in_,
+        max_depth=forest.max_depth,
+    )
+
+
+def compare_models(reference, candidate, X, y):
+    """Accuracy of both models on (X, y) and how often they disagree."""
+    expected = np.asarray(reference.predict(X))
+    predicted = np.asarray(candidate.predict(X))
+    reference_acc = float((expected == np.asarray(y)).mean())
+    candidate_acc = float((predicted == np.asarray(y)).mean())
+    return {
+        "samples": int(len(X)),
+        "reference_accuracy": reference_acc,
+        "candidate_accuracy": candidate_acc,
+        "accuracy_delta": candidate_acc - reference_acc,
+        "disagreements": int((expected != predicted).sum()),
+    }
+
+
+def forest_nbytes(forest):
+    return sum(getattr(forest, name).nbytes for name in _ARRAY_NAMES)
+
+
+def compile_forest(model):
+    """Flatten a fitted RandomForestClassifier into a CompiledForest."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    n_classes = len(model.classes_)
+    features, thresholds, children, value_rows, leaf_probas, roots = [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        count = tree.node_count
+        node_ids = np.arange(count)
+        is_leaf = tree.children_left == -1
+
+        # Leaves loop back onto themselves and read feature 0 harmlessly
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        left = np.where(is_leaf, node_ids, tree.children_left)
+        right = np.where(is_leaf, node_ids, tree.children_right)
+        children.append((np.stack([right, left], axis=1) + offset).astype(np.int32).ravel())
+
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        proba = tree.value[is_leaf, 0, :n_classes].astype(np.float64)
+        normalizer = proba.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_probas.append(proba / normalizer)
+
+        rows = np.zeros(count, dtype=np.int32)
+        rows[is_leaf] = np.arange(n_leaves, n_leaves + int(is_leaf.sum()), dtype=np.int32)
+        value_rows.append(rows)
+
+        roots.append(offset)
+        offset += count
+        n_leaves += int(is_leaf.sum())
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        children=np.concatenate(children),
+        value_row=np.concatenate(value_rows),
+        leaf_proba=np.concatenate(leaf_probas),
+        roots=np.array(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        n_features_in=model.n_features_in_,
+        max_depth=max_depth,
+    )
+
+
+def model_fingerprint(model_path):
+    """SHA-256 of a model.pkl; identifies the model a compiled artifact was built from."""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_forest(forest, path, fingerprint=None):
+    """
+    Write a CompiledForest into the directory `path`.
+
+    `fingerprint` is the model_fingerprint of the model.pkl it came from;
+    the predictor ignores a compiled forest that does not match model.pkl.
+
+    Arrays get fresh file names and header.json is replaced last, so readers
+    (and the hot-reload watcher) only ever see a complete model. Files from the
+    previous version are removed when nothing holds them open.
+    """
+    os.makedirs(path, exist_ok=True)
+    header_path = os.path.join(path, HEADER_NAME)
+    previous = _read_header(header_path) if os.path.isfile(header_path) else None
+
+    stamp = uuid.uuid4().hex[:12]
+    files = {}
+    for name in _ARRAY_NAMES:
+        files[name] = f"{name}-{stamp}.npy"
+        np.save(os.path.join(path, files[name]), np.ascontiguousarray(getattr(forest, name)))
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "engine": forest.engine,
+        "n_features_in": forest.n_features_in_,
+        "n_estimators": forest.n_estimators,
+        "max_depth": forest.max_depth,
+        "n_nodes": int(len(forest.feature)),
+        "labels": [str(label) for label in forest.classes_],
+        "arrays": files,
+        "model_fingerprint": fingerprint,
+    }
+    tmp_path = header_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp_path, header_path)
+
+    if previous:
+        for fname in previous["arrays"].values():
+            try:
+                os.remove(os.path.join(path, fname))
+            except OSError:
+                # Still mapped by a running process (Windows); left for next save
+                pass
+
+
+def _read_header(header_path):
+    with open(header_path) as f:
+        header = json.load(f)
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model format: {header.get('format_version')}")
+    return header
+
+
+def forest_fingerprint(path):
+    """The model.pkl fingerprint recorded in a compiled forest directory (None if absent)"""
+    return _read_header(os.path.join(path, HEADER_NAME)).get("model_fingerprint")
+
+
+def load_forest(path, mmap=True):
+    """Open a compiled forest directory; arrays are memory-mapped read-only by default."""
+    header = _read_header(os.path.join(path, HEADER_NAME))
+    arrays = {}
+    for name in _ARRAY_NAMES:
+        array = np.load(
+            os.path.join(path, header["arrays"][name]),
+            mmap_mode="r" if mmap else None,
+            allow_pickle=False,
+        )
+        # Plain ndarray views over the mapping avoid np.memmap overhead per op
+        arrays[name] = array.view(np.ndarray)
+
+    engine = PackedForest if header.get("engine") == "packed" else CompiledForest
+    return engine(
+        classes=np.array(header["labels"]),
+        n_features_in=header["n_features_in"],
+        max_depth=header["max_depth"],
+        **arrays,
+    )
@@ -0,0 +1,77 @@
+"""
+LRU cache of predictions for near-identical hands.
+
+While a sign is held, consecutive frames give almost the same landmarks.
+The key is the hand moved so the wrist is at the origin and rounded to a
+grid of `step`, so such frames share an entry and skip the model. Entries
+belong to one model object; a hot-swapped model starts from an empty
+cache.
+
+A coarser step gives more hits but may merge hands the model would tell
+apart; tune_prediction_cache.py measures both on recorded .npy data.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache:
+    def __init__(self, step=0.01, max_size=4096):
+        self.step = float(step)
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()
+        self._model = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def keys(self, points):
+        """One key per hand of an (N, ..., 21, 3) landmark array"""
+        relative = points - points[..., :1, :]
+        grid = np.round(relative / self.step).astype(np.int32)
+        return [row.tobytes() for row in grid.reshape(len(grid), -1)]
+
+    def lookup(self, model, keys):
+        """Cached values of `model` for `keys` (None where missing)"""
+        with self._lock:
+            if model is not self._model:
+                self._entries.clear()
+                self._model = model
+            values = []
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                values.append(value)
+            hits = sum(value is not None for value in values)
+            self.hits += hits
+            self.misses += len(values) - hits
+            return values
+
+    def store(self, model, keys, values):
+        with self._lock:
+            if model is not self._model:
+                # The model changed while these were computed
+                return
+            for key, value in zip(keys, values):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "step": self.step,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
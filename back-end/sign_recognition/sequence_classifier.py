@@ -0,0 +1,198 @@
+"""
+Live classification of dynamic signs over per-stream landmark sequences.
+
+The model (trained by train_sequences.py) sees windows of `window` frames
+sampled at `fps`. Live frames arrive at whatever rate the client sends and
+the server keeps, so each stream resamples them by arrival time onto that
+frame clock (nearest frame per tick) before they enter its StreamingWindow.
+When frames are further apart than `max_gap` the window starts over: a
+stream too sparse for the model's frame rate is never classified instead
+of being fed out-of-distribution motion features. Once full, the window is
+classified every `stride` samples. Streams are bounded LRU and dropped when
+idle.
+"""
+import os
+import time
+import pickle
+import threading
+import numpy as np
+
+from inference.stream_registry import StreamRegistry
+from sign_recognition.sequence_features import StreamingWindow, frame_vector
+
+_SEQUENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sequence_model.pkl")
+
+
+class _SequenceStream:
+    def __init__(self, window, sid=None):
+        self.window = StreamingWindow(window)
+        self.sid = sid
+        self.since_run = 0
+        self.last_used = 0.0
+        self.last_time = None      # arrival time of the previous frame
+        self.last_vector = None
+        self.origin = 0.0          # frame clock: tick n is at origin + n * interval
+        self.ticks = 0
+
+
+class SequenceStreams:
+    def __init__(self, model, window, fps, stride=1, min_confidence=0.6, max_gap=None,
+                 max_streams=64, idle_timeout=60.0):
+        self.model = model
+        self.window = int(window)
+        self.fps = float(fps)
+        self.interval = 1.0 / self.fps
+        # Up to two missing ticks are bridged with the nearest frame
+        self.max_gap = float(max_gap) if max_gap else 2.5 * self.interval
+        self.stride = max(1, int(stride))
+        self.min_confidence = float(min_confidence)
+        self._streams = StreamRegistry(
+            lambda sid: _SequenceStream(self.window, sid), max_streams, idle_timeout
+        )
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._samples = 0
+        self._restarts = 0
+        self._runs = 0
+
+    def _resample(self, stream, vector, now):
+        """Push the frame clock ticks up to `now`; returns how many samples were added"""
+        # Caller holds self._lock
+        if stream.last_time is None or now - stream.last_time > self.max_gap:
+            if stream.last_time is not None:
+                # Too sparse for the model's frame rate: start a new window
+                self._restarts += 1
+                stream.window = StreamingWindow(self.window)
+                stream.since_run = 0
+            stream.window.push(vector)
+            stream.origin, stream.ticks = now, 1
+            added = 1
+        else:
+            now = max(now, stream.last_time)
+            added = 0
+            while True:
+                tick = stream.origin + stream.ticks * self.interval
+                # The tolerance absorbs float error when frames arrive exactly on the clock
+                if tick > now + 1e-6:
+                    break
+                nearer = now - tick <= tick - stream.last_time
+                stream.window.push(vector if nearer else stream.last_vector)
+                stream.ticks += 1
+                added += 1
+        stream.last_time, stream.last_vector = now, vector
+        return added
+
+    def push(self, key, hands, sid=None, at=None):
+        """
+        Add one frame of stream `key` ((H, 21, 3) landmarks, or None for no
+        hand) that arrived at monotonic time `at` (default now).
+
+        Returns { "sign": label or None, "confidence": 0.9 } when the model
+        ran on this frame, else None.
+        """
+        now = time.monotonic() if at is None else at
+        with self._lock:
+            stream, _ = self._streams.get_or_create(key, sid)
+            self._frames += 1
+            added = self._resample(stream, frame_vector(hands), now)
+            self._samples += added
+            stream.since_run += added
+            if not stream.window.full or stream.since_run < self.stride:
+                return None
+            stream.since_run = 0
+            features = stream.window.features()
+            self._runs += 1
+
+        proba = self.model.predict_proba(features[np.newaxis])[0]
+        best = int(np.argmax(proba))
+        confidence = float(proba[best])
+        return {
+            'sign': str(self.model.classes_[best]) if confidence >= self.min_confidence else None,
+            'confidence': confidence,
+        }
+
+    def close(self, key):
+        with self._lock:
+            self._streams.pop(key)
+
+    def close_sid(self, sid):
+        with self._lock:
+            self._streams.pop_sid(sid)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'window': self.window,
+                'fps': self.fps,
+                'stride': self.stride,
+                'streams': len(self._streams),
+                'frames': self._frames,
+                'samples': self._samples,
+                'window_restarts': self._restarts,
+                'classifications': self._runs,
+            }
+
+
+class _Disabled:
+    """Stand-in when no sequence model has been trained"""
+
+    def push(self, key, hands, sid=None, at=None):
+        return None
+
+    def close(self, key):
+        pass
+
+    def close_sid(self, sid):
+        pass
+
+    def stats(self):
+        return {'enabled': False}
+
+
+_streams = None
+_streams_lock = threading.Lock()
+
+def get_sequence_streams():
+    """
+    Return this process's SequenceStreams (SIGN_SEQUENCE_STRIDE,
+    SIGN_SEQUENCE_MIN_CONFIDENCE); disabled by SIGN_SEQUENCE=False or
+    when no sequence_model.pkl has been trained.
+    """
+    global _streams
+    if _streams is None:
+        with _streams_lock:
+            if _streams is None:
+                if os.getenv('SIGN_SEQUENCE', 'True') != 'True' or not os.path.isfile(_SEQUENCE_PATH):
+                    _streams = _Disabled()
+                else:
+                    with open(_SEQUENCE_PATH, "rb") as f:
+                        saved = pickle.load(f)
+                    if "fps" not in saved:
+                        print("❌ sequence_model.pkl has no frame rate; retrain it with train_sequences.py", flush=True)
+                        _streams = _Disabled()
+                        return _streams
+                    if hasattr(saved["model"], "verbose"):
+                        saved["model"].verbose = 0
+                    _streams = SequenceStreams(
+                        saved["model"],
+                        window=saved["window"],
+                        fps=saved["fps"],
+                        stride=int(os.getenv('SIGN_SEQUENCE_STRIDE', str(saved["stride"]))),
+                        min_confidence=float(os.getenv('SIGN_SEQUENCE_MIN_CONFIDENCE', '0.6')),
+                    )
+                    print(f"✅ Sequence model loaded (window {saved['window']} frames at {saved['fps']} fps)", flush=True)
+    return _streams
+
+def apply_sequence(scored, key, sid, hands, at=None):
+    """
+    Feed one frame of stream `key` (arrived at monotonic time `at`) to its
+    sequence window; when the sequence model recognises a dynamic sign it
+    overrides the frame's static prediction ("source": "sequence").
+    """
+    sequence = get_sequence_streams().push(key, hands, sid, at)
+    if sequence is not None and sequence['sign'] is not None:
+        scored['sign'] = sequence['sign']
+        scored['confidence'] = sequence['confidence']
+        scored['source'] = 'sequence'
+    return scored
@@ -0,0 +1,101 @@
+"""
+Window features for dynamic (motion-defined) signs.
+
+A frame is 2 hands * 21 landmarks * (x, y, z) = 126 values (missing hands
+are zero). A window of W frames is described by, per value:
+    last frame, mean, standard deviation, net displacement (last - first)
+    and mean absolute velocity (mean |frame[t] - frame[t-1]|)
+giving 5 * 126 features whatever W is.
+
+window_features computes them for many windows at once (training);
+StreamingWindow keeps running sums over a ring buffer so that adding a
+frame and reading the features cost O(126) regardless of W (live streams).
+Both produce the same numbers.
+"""
+import numpy as np
+
+FRAME_SIZE = 2 * 21 * 3
+N_STATS = 5
+
+def frame_vector(hands):
+    """(126,) vector from an (H, 21, 3) array of up to two hands (or None)"""
+    vector = np.zeros(FRAME_SIZE, dtype=np.float64)
+    if hands is not None and len(hands):
+        flat = np.asarray(hands, dtype=np.float64)[:2].reshape(-1)
+        vector[:len(flat)] = flat
+    return vector
+
+def sliding_windows(sequence, window, stride=1):
+    """(n, window, D) view of every `stride`-th window of a (T, D) sequence"""
+    sequence = np.asarray(sequence, dtype=np.float64)
+    if len(sequence) < window:
+        return np.empty((0, window, sequence.shape[1]))
+    views = np.lib.stride_tricks.sliding_window_view(sequence, window, axis=0)
+    # sliding_window_view puts the window axis last
+    return views[::stride].transpose(0, 2, 1)
+
+def window_features(windows):
+    """(n, 5 * D) features for an (n, W, D) batch of windows"""
+    windows = np.asarray(windows, dtype=np.float64)
+    deltas = np.abs(np.diff(windows, axis=1))
+    mean = windows.mean(axis=1)
+    return np.concatenate([
+        windows[:, -1],
+        mean,
+        np.sqrt(np.maximum((windows ** 2).mean(axis=1) - mean ** 2, 0.0)),
+        windows[:, -1] - windows[:, 0],
+        deltas.mean(axis=1) if deltas.shape[1] else np.zeros_like(mean),
+    ], axis=1)
+
+
+class StreamingWindow:
+    """Fixed ring buffer of the last `window` frames with O(1) feature updates"""
+
+    def __init__(self, window, size=FRAME_SIZE):
+        self.window = int(window)
+        self.frames = np.zeros((self.window, size))
+        self.deltas = np.zeros((self.window, size))   # |frame[t] - frame[t-1]|, slot of t
+        self.count = 0
+        self.head = 0            # slot the next frame goes into
+        self.sum = np.zeros(size)
+        self.sum_sq = np.zeros(size)
+        self.sum_delta = np.zeros(size)
+
+    @property
+    def full(self):
+        return self.count >= self.window
+
+    def push(self, frame):
+        frame = np.asarray(frame, dtype=np.float64)
+        slot = self.head
+        if self.full:
+            # The oldest frame and the delta into the new oldest frame leave the window
+            oldest = self.frames[slot]
+            self.sum -= oldest
+            self.sum_sq -= oldest ** 2
+            self.sum_delta -= self.deltas[(slot + 1) % self.window]
+        if self.count:
+            delta = np.abs(frame - self.frames[slot - 1])
+            self.deltas[slot] = delta
+            self.sum_delta += delta
+        else:
+            self.deltas[slot] = 0.0
+        self.frames[slot] = frame
+        self.sum += frame
+        self.sum_sq += frame ** 2
+        self.head = (slot + 1) % self.window
+        self.count += 1
+
+    def features(self):
+        """Same layout as window_features for the frames currently held"""
+        n = min(self.count, self.window)
+        last = self.frames[self.head - 1]
+        first = self.frames[self.head if self.full else 0]
+        mean = self.sum / n
+        return np.concatenate([
+            last,
+            mean,
+            np.sqrt(np.maximum(self.sum_sq / n - mean ** 2, 0.0)),
+            last - first,
+            self.sum_delta / (n - 1) if n > 1 else np.zeros_like(mean),
+        ])
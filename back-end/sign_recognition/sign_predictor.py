@@ -1,64 +1,453 @@
 import os
+import time
 import pickle
+import threading
 import numpy as np
 
+from sign_recognition.forest_engine import HEADER_NAME, forest_fingerprint, load_forest, model_fingerprint
+from sign_recognition.prediction_cache import PredictionCache
+
 # Resolve model path relative to this file
 _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _MODEL_PATH = os.path.join(_SCRIPT_DIR, "model.pkl")
+# Memory-mapped forest directory written by compile_model.py and the training scripts;
+# only used while its header records the fingerprint of the current model.pkl
+_FOREST_PATH = os.path.join(_SCRIPT_DIR, "model_forest")
+_FOREST_HEADER = os.path.join(_FOREST_PATH, HEADER_NAME)
+# Quantized forest (float16 thresholds, small ints); opt in with SIGN_MODEL_PACKED=True
+_PACKED_PATH = os.path.join(_SCRIPT_DIR, "model_packed")
+_PACKED_HEADER = os.path.join(_PACKED_PATH, HEADER_NAME)
+USE_PACKED = os.getenv('SIGN_MODEL_PACKED', 'False') == 'True'
+# Nearest-centroid / KD-tree first stage written by train_collected_npy.py
+_CASCADE_PATH = os.path.join(_SCRIPT_DIR, "cascade.npz")
 
+# The active model is only ever replaced by rebinding _MODEL, so a caller that
+# grabbed a reference keeps using it until its prediction finishes.
 _MODEL = None
+_MODEL_VERSION = 0
+_MODEL_SIGNATURE = None
+_MODEL_LOCK = threading.Lock()
+# ((mtime, size), sha256) of model.pkl, so it is only hashed when it changes
+_PICKLE_FINGERPRINT = None
+_STALE_WARNED = set()
+_WATCHER = None
+
+# Cascade first stage (opt-in); rebuilt whenever the model version changes
+USE_CASCADE = os.getenv('SIGN_CASCADE', 'False') == 'True'
+_CASCADE = None
+_CASCADE_VERSION = None
+
+# Cache of recent predictions keyed on quantized wrist-relative landmarks;
+# opt in with SIGN_PREDICTION_CACHE_STEP (e.g. 0.01)
+_CACHE_STEP = float(os.getenv('SIGN_PREDICTION_CACHE_STEP', '0'))
+_PREDICTION_CACHE = (
+    PredictionCache(_CACHE_STEP, int(os.getenv('SIGN_PREDICTION_CACHE_SIZE', '4096')))
+    if _CACHE_STEP > 0 else None
+)
+
+# MediaPipe hand has 21 landmarks
+_NUM_LANDMARKS = 21
+
+# Frames whose winning vote fraction is below this are reported as undecided
+MIN_CONFIDENCE = float(os.getenv('SIGN_MIN_CONFIDENCE', '0.0'))
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _pickle_fingerprint():
+    global _PICKLE_FINGERPRINT
+    stat = _stat(_MODEL_PATH)
+    if stat is None:
+        return None
+    cached = _PICKLE_FINGERPRINT
+    if cached is None or cached[0] != stat:
+        try:
+            cached = _PICKLE_FINGERPRINT = (stat, model_fingerprint(_MODEL_PATH))
+        except OSError:
+            return None
+    return cached[1]
+
+def _compiled_is_current(header_path):
+    """True when a compiled forest was built from the current model.pkl (or there is none)."""
+    expected = _pickle_fingerprint()
+    if expected is None:
+        return True
+    try:
+        found = forest_fingerprint(os.path.dirname(header_path))
+    except (OSError, ValueError):
+        return False
+    if found == expected:
+        return True
+    if (header_path, expected) not in _STALE_WARNED:
+        _STALE_WARNED.add((header_path, expected))
+        print(f"⚠️  {os.path.dirname(header_path)} was not compiled from the current model.pkl; "
+              "serving model.pkl instead (re-run compile_model.py)", flush=True)
+    return False
+
+def _artifact_signature():
+    """
+    (path, mtime, size, model.pkl (mtime, size)) of the artifact _read_model
+    would load, or None. model.pkl is part of every signature, so the
+    watcher notices a replaced pickle even while a compiled forest is served.
+    """
+    pickle_stat = _stat(_MODEL_PATH)
+    headers = (_PACKED_HEADER, _FOREST_HEADER) if USE_PACKED else (_FOREST_HEADER,)
+    for path in headers + (_MODEL_PATH,):
+        stat = _stat(path)
+        if stat is None:
+            continue
+        if path != _MODEL_PATH and not _compiled_is_current(path):
+            continue
+        return (path,) + stat + (pickle_stat,)
+    return None
+
+def _read_model(path):
+    if path in (_FOREST_HEADER, _PACKED_HEADER):
+        return load_forest(os.path.dirname(path))
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def _warm_up(model):
+    """Validate a freshly loaded model with one prediction before it serves traffic."""
+    expected = getattr(model, "n_features_in_", None) or 42
+    if expected not in (42, 63, 126):
+        raise ValueError(f"Unsupported feature size: {expected}")
+    label = model.predict(np.zeros((1, expected), dtype=np.float32))[0]
+    if label not in list(model.classes_):
+        raise ValueError(f"Warm-up prediction {label!r} is not a known class")
 
 def _load_model():
-    global _MODEL
-    if _MODEL is None:
-        if not os.path.isfile(_MODEL_PATH):
-            raise FileNotFoundError(
-                f"Model file not found at {_MODEL_PATH}. "
-                "Train a model via train_collected_npy.py, train_from_dataset.py, or train_conversation_signs.py."
+    global _MODEL, _MODEL_VERSION, _MODEL_SIGNATURE
+    model = _MODEL
+    if model is not None:
+        return model
+
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            signature = _artifact_signature()
+            if signature is None:
+                raise FileNotFoundError(
+                    f"Model file not found at {_MODEL_PATH}. "
+                    "Train a model via train_collected_npy.py, train_from_dataset.py, or train_conversation_signs.py."
+                )
+            _MODEL = _read_model(signature[0])
+            _MODEL_SIGNATURE = signature
+            _MODEL_VERSION += 1
+        return _MODEL
+
+def preload_model():
+    """Load the model now (e.g. in a pre-fork parent) instead of on the first frame."""
+    return _load_model()
+
+def get_model_version():
+    """Monotonic counter bumped every time a new model is swapped in."""
+    return _MODEL_VERSION
+
+def reload_model():
+    """
+    Load, validate and warm up the current artifact, then swap it in.
+
+    The old model keeps serving until the swap; on any failure it stays active.
+    Returns True when a new model was installed.
+    """
+    global _MODEL, _MODEL_VERSION, _MODEL_SIGNATURE
+    signature = _artifact_signature()
+    if signature is None:
+        return False
+
+    try:
+        candidate = _read_model(signature[0])
+        _warm_up(candidate)
+    except Exception as e:
+        print(f"❌ Model reload failed, keeping current model: {e}", flush=True)
+        return False
+
+    with _MODEL_LOCK:
+        _MODEL = candidate
+        _MODEL_SIGNATURE = signature
+        _MODEL_VERSION += 1
+    print(f"🔄 Loaded new sign model (version {_MODEL_VERSION}) from {signature[0]}", flush=True)
+    return True
+
+def _watch_model(interval):
+    pending = None
+    rejected = None
+    while True:
+        time.sleep(interval)
+        signature = _artifact_signature()
+        if signature is None or signature in (_MODEL_SIGNATURE, rejected):
+            pending = None
+            continue
+        # Only reload once the file has stopped changing between two polls,
+        # so a training script that is still writing is never picked up.
+        if signature == pending:
+            if not reload_model():
+                rejected = signature
+            pending = None
+        else:
+            pending = signature
+
+def start_model_watcher(interval=2.0):
+    """Poll the model artifact in a daemon thread and hot-swap it when it changes."""
+    global _WATCHER
+    with _MODEL_LOCK:
+        if _WATCHER is None or not _WATCHER.is_alive():
+            _WATCHER = threading.Thread(
+                target=_watch_model, args=(interval,), name="sign-model-watcher", daemon=True
             )
-        with open(_MODEL_PATH, "rb") as f:
-            _MODEL = pickle.load(f)
-    return _MODEL
+            _WATCHER.start()
+    return _WATCHER
 
-def predict_sign(hand_landmarks):
+def landmarks_to_array(hands):
     """
-    Predict a sign from MediaPipe hand_landmarks.
+    Stack hands into an (N, 21, 3) float32 array.
+
+    Accepts an (N, 21, 3) / (21, 3) array or a sequence of MediaPipe
+    hand_landmarks objects. An (N, H, 21, 3) array of H hands per frame
+    is kept four-dimensional.
+    """
+    if not isinstance(hands, np.ndarray) and len(hands) and not hasattr(hands[0], "landmark"):
+        # A list of per-hand arrays
+        hands = np.asarray(hands, dtype=np.float32)
+
+    if isinstance(hands, np.ndarray):
+        points = np.asarray(hands, dtype=np.float32)
+        if points.ndim == 2:
+            points = points[np.newaxis]
+        if points.ndim not in (3, 4) or points.shape[-2] < _NUM_LANDMARKS or points.shape[-1] not in (2, 3):
+            raise ValueError(f"Expected landmarks of shape (N, 21, 3), got {hands.shape}")
+        points = points[..., :_NUM_LANDMARKS, :]
+        if points.shape[-1] == 2:
+            # Some pipelines may not have z; default to 0.0 if missing
+            points = np.concatenate([points, np.zeros_like(points[..., :1])], axis=-1)
+        return points
+
+    return np.array(
+        [
+            [(lm.x, lm.y, getattr(lm, "z", 0.0)) for lm in hand.landmark[:_NUM_LANDMARKS]]
+            for hand in hands
+        ],
+        dtype=np.float32,
+    ).reshape(-1, _NUM_LANDMARKS, 3)
+
+def _build_features(points, expected):
+    """
+    Build the (N, expected) feature matrix for a batch of (N, 21, 3) landmarks.
 
     Supports models trained with:
       - 42 features: 21 landmarks * (x, y)
       - 63 features: 21 landmarks * (x, y, z)
       - 126 features: 2 hands * 21 landmarks * (x, y, z) (second hand zero-padded)
+
+    For (N, H, 21, 3) input only two-hand models see the second hand.
     """
-    model = _load_model()
+    n = points.shape[0]
+    if points.ndim == 4 and expected != 126:
+        points = points[:, 0]
 
-    # Build feature vectors
-    vec_xy = []
-    vec_xyz = []
-    # Only the first hand's landmarks are passed in this function
-    # MediaPipe hand has 21 landmarks
-    for lm in hand_landmarks.landmark[:21]:
-        vec_xy.extend([lm.x, lm.y])
-        # Some pipelines may not have z; default to 0.0 if missing
-        z = getattr(lm, "z", 0.0)
-        vec_xyz.extend([lm.x, lm.y, z])
-
-    expected = getattr(model, "n_features_in_", None)
-
-    if expected == 63:
-        vec = vec_xyz
-    elif expected == 126:
-        # Pad a second hand (zeros) to reach 126 if only one hand provided
-        vec = vec_xyz + [0.0] * (126 - len(vec_xyz))
+    if expected in (63, 126):
+        # For 126 the second hand is zero-padded below
+        vec = points.reshape(n, -1)
     else:
         # Default to 42 (x, y) if model doesn't expose n_features_in_
         expected = 42 if expected is None else expected
-        vec = vec_xy
+        vec = points[:, :, :2].reshape(n, -1)
 
     # Ensure correct length via pad/truncate
-    if len(vec) < expected:
-        vec = vec + [0.0] * (expected - len(vec))
-    elif len(vec) > expected:
-        vec = vec[:expected]
+    features = np.zeros((n, expected), dtype=np.float32)
+    width = min(expected, vec.shape[1])
+    features[:, :width] = vec[:, :width]
+    return features
+
+def _get_cascade(model):
+    """The cascade stage for the current model, or None when disabled/unusable."""
+    global _CASCADE, _CASCADE_VERSION
+    if not USE_CASCADE:
+        return None
+    if _CASCADE_VERSION != _MODEL_VERSION:
+        cascade = None
+        if os.path.isfile(_CASCADE_PATH):
+            from sign_recognition.cascade import load_cascade
+            cascade = load_cascade(_CASCADE_PATH)
+            # A cascade left over from a differently trained model is ignored;
+            # every served artifact is compiled from model.pkl
+            if cascade.fingerprint != _pickle_fingerprint():
+                print("⚠️  cascade.npz was built for another model.pkl; cascade disabled "
+                      "until train_collected_npy.py is re-run", flush=True)
+                cascade = None
+            elif not set(cascade.labels.tolist()) <= set(np.asarray(model.classes_).tolist()):
+                cascade = None
+        _CASCADE, _CASCADE_VERSION = cascade, _MODEL_VERSION
+    cascade = _CASCADE
+    if cascade is None or cascade.n_features != getattr(model, "n_features_in_", None):
+        return None
+    return cascade
+
+def _query_cascade(model, features):
+    """Run the cascade stage; returns (labels, agreement, hit mask) or None."""
+    cascade = _get_cascade(model)
+    if cascade is None:
+        return None
+    winner, agreement, hit = cascade.query(features)
+    return cascade.labels[winner], agreement, hit
+
+def get_cascade_stats():
+    """Hit counters of the cascade stage (how many frames skipped the forest)."""
+    cascade = _CASCADE
+    if not USE_CASCADE or cascade is None:
+        return {"enabled": USE_CASCADE, "lookups": 0, "hits": 0, "hit_rate": 0.0}
+    return {"enabled": True, **cascade.stats()}
+
+def enable_prediction_cache(step=0.01, max_size=4096):
+    """Install a fresh prediction cache (step None or 0 turns it off)."""
+    global _PREDICTION_CACHE
+    _PREDICTION_CACHE = PredictionCache(step, max_size) if step else None
+    return _PREDICTION_CACHE
+
+def get_prediction_cache_stats():
+    """Hit/miss counters of the prediction cache."""
+    cache = _PREDICTION_CACHE
+    if cache is None:
+        return {"enabled": False, "lookups": 0, "hits": 0, "hit_rate": 0.0}
+    return {"enabled": True, **cache.stats()}
+
+def _cache_lookup(model, points, tag):
+    """(keys, cached values) for each hand, or (None, all None) without a cache."""
+    cache = _PREDICTION_CACHE
+    if cache is None:
+        return None, [None] * len(points)
+    keys = [tag + key for key in cache.keys(points)]
+    return keys, cache.lookup(model, keys)
+
+def _cache_store(model, keys, rows, values):
+    cache = _PREDICTION_CACHE
+    if cache is not None and keys is not None and rows:
+        cache.store(model, [keys[i] for i in rows], values)
+
+def predict_sign_batch(hands):
+    """
+    Predict signs for many hands with a single model call.
+
+    `hands` is a sequence of MediaPipe hand_landmarks objects or an
+    (N, 21, 3) array of (x, y, z) landmarks. Returns a list of N labels.
+    With SIGN_CASCADE=True, unambiguous frames are answered by the cascade
+    stage and only the rest reach the forest.
+    """
+    model = _load_model()
+
+    points = landmarks_to_array(hands)
+    if len(points) == 0:
+        return []
+
+    keys, labels = _cache_lookup(model, points, b"label/")
+    pending = [i for i, label in enumerate(labels) if label is None]
+    if not pending:
+        return labels
+
+    features = _build_features(points[pending], getattr(model, "n_features_in_", None))
+    computed = np.empty(len(features), dtype=object)
+    hit = np.zeros(len(features), dtype=bool)
+
+    staged = _query_cascade(model, features)
+    if staged is not None:
+        cascade_labels, _, hit = staged
+        computed[hit] = cascade_labels[hit]
+    if not hit.all():
+        computed[~hit] = model.predict(features[~hit])
+    computed = [str(label) for label in computed]
+    for i, label in zip(pending, computed):
+        labels[i] = label
+    _cache_store(model, keys, pending, computed)
+    return labels
+
+def predict_sign(hand_landmarks):
+    """
+    Predict a sign from MediaPipe hand_landmarks.
+
+    Thin wrapper around predict_sign_batch for a single hand.
+    """
+    return predict_sign_batch([hand_landmarks])[0]
+
+def _vote(model, features, early_exit):
+    """Vote fractions and trees evaluated per row, for compiled or sklearn models."""
+    if hasattr(model, "vote"):
+        return model.vote(features, early_exit=early_exit)
+    # sklearn forests have no early exit; every tree always votes
+    proba = model.predict_proba(features)
+    n_trees = len(getattr(model, "estimators_", ())) or 1
+    return proba, np.full(len(proba), n_trees)
+
+def score_sign_batch(hands, top_k=3, min_confidence=None, early_exit=True):
+    """
+    Predict signs with confidence for many hands.
+
+    Returns one dict per hand:
+      { "sign": label or None, "confidence": 0.93,
+        "alternatives": [{"sign": label, "confidence": 0.04}, ...],
+        "trees_used": 101 }
+    "sign" is None when the winning vote fraction is below min_confidence
+    (SIGN_MIN_CONFIDENCE by default), so callers can drop uncertain frames.
+    With early_exit, batches of at least EARLY_EXIT_MIN_ROWS rows stop
+    voting once a row's winner can no longer change, and confidences are
+    fractions over the trees actually evaluated; smaller batches always use
+    every tree, which is faster for them. Frames the
+    cascade stage answers report trees_used 0. With the prediction cache on,
+    near-identical hands reuse an earlier result.
+    """
+    model = _load_model()
+    min_confidence = MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+    points = landmarks_to_array(hands)
+    if len(points) == 0:
+        return []
+
+    # Entries hold the unthresholded winner so any min_confidence can reuse them
+    keys, entries = _cache_lookup(model, points, f"score/{top_k}/{early_exit}/".encode())
+    todo = [i for i, entry in enumerate(entries) if entry is None]
+    if todo:
+        features = _build_features(points[todo], getattr(model, "n_features_in_", None))
+        computed = [None] * len(todo)
+
+        staged = _query_cascade(model, features)
+        if staged is not None:
+            cascade_labels, agreement, hit = staged
+            for j in np.flatnonzero(hit):
+                # Cascade answers report the share of nearest samples that agree
+                computed[j] = (str(cascade_labels[j]), float(agreement[j]), [], 0)
+
+        pending = [j for j, entry in enumerate(computed) if entry is None]
+        if pending:
+            proba, trees_used = _vote(model, features[pending], early_exit)
+            ranked = np.argsort(-proba, axis=1, kind="stable")[:, :max(top_k, 1)]
+            for j, row, order, used in zip(pending, proba, ranked, trees_used):
+                computed[j] = (
+                    str(model.classes_[order[0]]),
+                    float(row[order[0]]),
+                    [
+                        {"sign": str(model.classes_[k]), "confidence": float(row[k])}
+                        for k in order[1:] if row[k] > 0
+                    ],
+                    int(used),
+                )
+
+        for i, entry in zip(todo, computed):
+            entries[i] = entry
+        _cache_store(model, keys, todo, computed)
+
+    return [
+        {
+            "sign": label if confidence >= min_confidence else None,
+            "confidence": confidence,
+            "alternatives": list(alternatives),
+            "trees_used": trees_used,
+        }
+        for label, confidence, alternatives, trees_used in entries
+    ]
 
-    data = np.array(vec, dtype=np.float32).reshape(1, -1)
-    return model.predict(data)[0]
+def score_sign(hand_landmarks, top_k=3, min_confidence=None, early_exit=True):
+    """Single-hand wrapper around score_sign_batch."""
+    return score_sign_batch([hand_landmarks], top_k, min_confidence, early_exit)[0]
@@ -6,6 +6,9 @@ from collections import Counter
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 
+from forest_engine import compare_models, compile_forest, model_fingerprint, pack_forest, save_forest
+from cascade import build_cascade, save_cascade
+
 def load_npy_dataset(dataset_dir):
     X, y = [], []
     for fname in os.listdir(dataset_dir):
@@ -72,12 +75,38 @@ def main():
         pickle.dump(model, f)
     print(f"\n✓ Model saved: {model_path}")
 
+    fingerprint = model_fingerprint(model_path)
+    forest = compile_forest(model)
+    forest_path = os.path.join(script_dir, "model_forest")
+    save_forest(forest, forest_path, fingerprint=fingerprint)
+    print(f"✓ Compiled model saved: {forest_path}")
+
+    packed = pack_forest(forest)
+    report = compare_models(model, packed, X_test, y_test)
+    print(f"  Packed model test accuracy: {report['candidate_accuracy'] * 100:.2f}% "
+          f"(delta {report['accuracy_delta'] * 100:+.2f} pts)")
+    packed_path = os.path.join(script_dir, "model_packed")
+    save_forest(packed, packed_path, fingerprint=fingerprint)
+    print(f"✓ Packed model saved: {packed_path}")
+
+    # First-stage cascade (enable with SIGN_CASCADE=True)
+    cascade = build_cascade(X_train, y_train)
+    winner, _, hit = cascade.query(X_test)
+    forest_labels = model.predict(X_test[hit]) if hit.any() else []
+    agree = (cascade.labels[winner[hit]] == forest_labels).mean() if hit.any() else 0.0
+    print(f"\nCascade: {len(cascade.samples)} kept samples, "
+          f"held-out hit rate {hit.mean() * 100:.1f}%, "
+          f"agreement with forest on hits {agree * 100:.2f}%")
+    cascade_path = os.path.join(script_dir, "cascade.npz")
+    save_cascade(cascade, cascade_path, fingerprint=fingerprint)
+    print(f"✓ Cascade saved: {cascade_path}")
+
     labels_path = os.path.join(script_dir, "labels.json")
     with open(labels_path, "w") as f:
         json.dump({"labels": sorted(set(y))}, f, indent=2)
     print(f"✓ Labels saved: {labels_path}")
 
-    print("\nRestart the backend to load the new model.")
+    print("\nA running backend picks up the new model automatically.")
     print("=" * 60)
 
 if __name__ == "__main__":
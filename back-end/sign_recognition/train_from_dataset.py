@@ -7,6 +7,8 @@ from sklearn.ensemble import RandomForestClassifier
 import pickle
 import json
 
+from forest_engine import compare_models, compile_forest, model_fingerprint, pack_forest, save_forest
+
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
 
@@ -154,6 +156,20 @@ def train_model_from_dataset(dataset_path):
     
     print(f"✓ Model saved to: {model_path}")
     
+    fingerprint = model_fingerprint(model_path)
+    forest = compile_forest(model)
+    forest_path = os.path.join(script_dir, 'model_forest')
+    save_forest(forest, forest_path, fingerprint=fingerprint)
+    print(f"✓ Compiled model saved to: {forest_path}")
+    
+    packed = pack_forest(forest)
+    report = compare_models(model, packed, X_test, y_test)
+    print(f"  Packed model test accuracy: {report['candidate_accuracy'] * 100:.2f}% "
+          f"(delta {report['accuracy_delta'] * 100:+.2f} pts)")
+    packed_path = os.path.join(script_dir, 'model_packed')
+    save_forest(packed, packed_path, fingerprint=fingerprint)
+    print(f"✓ Packed model saved to: {packed_path}")
+    
     # Save label mapping
     labels_path = os.path.join(script_dir, 'labels.json')
     with open(labels_path, 'w') as f:
@@ -162,7 +178,7 @@ def train_model_from_dataset(dataset_path):
     print(f"✓ Labels saved to: {labels_path}")
     print("\n" + "=" * 60)
     print("TRAINING COMPLETED SUCCESSFULLY!")
-    print("Restart your backend server to use the new model.")
+    print("A running backend server picks up the new model automatically.")
     print("=" * 60)
     
     return model
@@ -0,0 +1,175 @@
+"""
+Train the sliding-window model for dynamic signs.
+
+Unlike train_conversation_signs.py, which averages a video into one vector,
+every frame's landmarks are kept and the sequence is cut into overlapping
+windows. Windows are described by sequence_features.window_features, the
+same features live streams compute incrementally.
+
+Videos are resampled to SIGN_SEQUENCE_FPS (default 10) whatever their
+native frame rate, and the rate is saved with the model: live streams are
+resampled to it too, and streams that send frames too far apart for it
+are not classified. Clients must send frames (e.g. landmark_frame) at
+about this rate or faster.
+
+Dataset structure (e.g. WLASL):
+    dataset/
+        HELLO/
+            video1.mp4
+        THANK_YOU/
+            video1.mp4
+"""
+import os
+import pickle
+import numpy as np
+import cv2
+import mediapipe as mp
+from collections import Counter
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+
+from sequence_features import StreamingWindow, frame_vector, sliding_windows, window_features
+
+WINDOW = int(os.getenv('SIGN_SEQUENCE_WINDOW', '16'))    # frames per window
+FPS = float(os.getenv('SIGN_SEQUENCE_FPS', '10'))        # frame rate windows are sampled at
+TRAIN_STRIDE = 2                                        # window step when cutting videos
+LIVE_STRIDE = 4                                         # samples between live classifications
+MIN_HAND_FRACTION = 0.5                                 # windows with fewer hand frames are skipped
+
+mp_hands = mp.solutions.hands
+
+def extract_sequence_from_video(video_path, hands):
+    """(T, 126) landmarks resampled to FPS (zeros where no hand was found)"""
+    cap = cv2.VideoCapture(video_path)
+    native = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    sequence = []
+    index = 0
+    next_tick = 0.0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        # The frame nearest to each tick of the FPS clock (repeated when the
+        # video is slower than FPS)
+        t = index / native
+        index += 1
+        if t + 0.5 / native < next_tick:
+            continue
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        points = None
+        if results.multi_hand_landmarks:
+            points = [[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                      for hand in results.multi_hand_landmarks[:2]]
+        vector = frame_vector(points)
+        while next_tick <= t + 0.5 / native:
+            sequence.append(vector)
+            next_tick += 1.0 / FPS
+    cap.release()
+    return np.array(sequence).reshape(-1, 126)
+
+def video_windows(sequence):
+    """Feature rows for the usable windows of one video"""
+    windows = sliding_windows(sequence, WINDOW, TRAIN_STRIDE)
+    if len(windows) == 0:
+        return np.empty((0, 5 * sequence.shape[1]))
+    has_hand = (np.abs(windows).sum(axis=2) > 0).mean(axis=1) >= MIN_HAND_FRACTION
+    return window_features(windows[has_hand])
+
+def load_sequences(dataset_path, max_videos_per_sign=200):
+    sequences, labels = [], []
+    for sign_folder in sorted(os.listdir(dataset_path)):
+        sign_path = os.path.join(dataset_path, sign_folder)
+        if not os.path.isdir(sign_path):
+            continue
+        videos = sorted(f for f in os.listdir(sign_path) if f.lower().endswith(('.mp4', '.avi', '.mov')))
+        videos = videos[:max_videos_per_sign]
+        print(f"Processing sign: {sign_folder} ({len(videos)} videos)")
+        with mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5) as hands:
+            for video in videos:
+                sequence = extract_sequence_from_video(os.path.join(sign_path, video), hands)
+                if len(sequence) >= WINDOW:
+                    sequences.append(sequence)
+                    labels.append(sign_folder.upper())
+    return sequences, np.array(labels)
+
+def windows_for(sequences, labels, indices):
+    X, y = [], []
+    for i in indices:
+        features = video_windows(sequences[i])
+        X.append(features)
+        y.extend([labels[i]] * len(features))
+    return np.concatenate(X) if X else np.empty((0, 5 * 126)), np.array(y)
+
+def check_streaming(sequence):
+    """Largest difference between the live (incremental) and training features"""
+    expected = window_features(sliding_windows(sequence, WINDOW, 1))
+    stream = StreamingWindow(WINDOW)
+    worst = 0.0
+    for t, frame in enumerate(sequence):
+        stream.push(frame)
+        if stream.full:
+            worst = max(worst, float(np.abs(stream.features() - expected[t - WINDOW + 1]).max()))
+    return worst
+
+def train_model(dataset_path):
+    print("=" * 70)
+    print("DYNAMIC SIGN SEQUENCE MODEL TRAINING")
+    print("=" * 70 + "\n")
+
+    sequences, labels = load_sequences(dataset_path)
+    if not sequences:
+        print("❌ Error: No videos long enough for a window were processed!")
+        return None
+
+    # Split by video so windows of one clip never land on both sides
+    train_idx, test_idx = train_test_split(
+        np.arange(len(sequences)), test_size=0.2, random_state=42,
+        stratify=labels if min(Counter(labels).values()) > 1 else None)
+    X_train, y_train = windows_for(sequences, labels, train_idx)
+    X_test, y_test = windows_for(sequences, labels, test_idx)
+
+    print(f"\nWindow: {WINDOW} frames at {FPS:g} fps ({WINDOW / FPS:.1f}s), {X_train.shape[1]} features")
+    print(f"  Training windows: {len(X_train)} from {len(train_idx)} videos")
+    print(f"  Testing windows: {len(X_test)} from {len(test_idx)} videos\n")
+    if len(X_train) == 0:
+        print("❌ Error: No windows with enough hand frames!")
+        return None
+
+    print("Training Random Forest classifier...")
+    model = RandomForestClassifier(
+        n_estimators=200,
+        max_depth=20,
+        min_samples_split=5,
+        random_state=42,
+        n_jobs=-1,
+    )
+    model.fit(X_train, y_train)
+
+    print("\n" + "=" * 70)
+    print("Training Results:")
+    print(f"  Training accuracy: {model.score(X_train, y_train) * 100:.2f}%")
+    if len(X_test):
+        print(f"  Testing accuracy: {model.score(X_test, y_test) * 100:.2f}%")
+    print(f"  Live vs. training feature difference: {check_streaming(sequences[0]):.2e}")
+    print("=" * 70 + "\n")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    model_path = os.path.join(script_dir, 'sequence_model.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump({'model': model, 'window': WINDOW, 'fps': FPS, 'stride': LIVE_STRIDE}, f)
+
+    print(f"✓ Sequence model saved to: {model_path}")
+    print("Restart the backend server to load it.")
+    return model
+
+if __name__ == "__main__":
+    print("\nDynamic Sign Sequence Model Trainer")
+    print("-" * 70)
+    dataset_path = input("Enter the full path to your video dataset folder: ").strip()
+    dataset_path = dataset_path.strip('"').strip("'")
+
+    if os.path.exists(dataset_path):
+        train_model(dataset_path)
+    else:
+        print(f"❌ Error: Path not found!")
+        print(f"Checked: {dataset_path}")
@@ -0,0 +1,89 @@
+"""
+Choose SIGN_PREDICTION_CACHE_STEP from data.
+
+Replays the last TUNE_FRACTION (default 0.2) of every *.npy file in
+TUNE_DATASET (default sign_recognition/dataset), frame by frame in recorded
+order, through score_sign with the cache off and with each candidate step.
+Reports hit rate, agreement with the uncached predictions, accuracy against
+the file labels and time per frame, then recommends the coarsest step whose
+agreement is at least TUNE_MIN_AGREEMENT (default 0.99).
+
+model.pkl is trained on a random split of all of sign_recognition/dataset,
+so by default the replayed frames are mostly training data: accuracy is
+optimistic and only the agreement column is meaningful. For held-out
+numbers, record new samples with collect_data.py into another folder and
+point TUNE_DATASET at it.
+
+Run from back-end/:
+    python -m sign_recognition.tune_prediction_cache [step ...]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+from sign_recognition.sign_predictor import enable_prediction_cache, get_prediction_cache_stats, preload_model, score_sign
+
+STEPS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.04)
+
+def load_tail(dataset_dir, fraction):
+    """(frames as (21, 2) landmarks, labels) from the tail of every .npy file"""
+    frames, labels = [], []
+    for fname in sorted(os.listdir(dataset_dir)):
+        if not fname.lower().endswith(".npy"):
+            continue
+        arr = np.load(os.path.join(dataset_dir, fname))
+        if arr.ndim != 2 or arr.shape[1] != 42:
+            continue
+        tail = arr[len(arr) - max(1, int(len(arr) * fraction)):]
+        frames.extend(tail.reshape(-1, 21, 2))
+        labels.extend([os.path.splitext(fname)[0].upper()] * len(tail))
+    return frames, np.array(labels)
+
+def replay(frames, step):
+    """Per-frame signs and ms per frame with the given cache step (None = off)"""
+    enable_prediction_cache(step)
+    start = time.perf_counter()
+    signs = [score_sign(frame)["sign"] for frame in frames]
+    elapsed = (time.perf_counter() - start) * 1000 / len(frames)
+    return np.array(signs, dtype=object), elapsed
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    default_dataset = os.path.join(script_dir, "dataset")
+    dataset_dir = os.getenv('TUNE_DATASET', default_dataset)
+    fraction = float(os.getenv('TUNE_FRACTION', '0.2'))
+    min_agreement = float(os.getenv('TUNE_MIN_AGREEMENT', '0.99'))
+    steps = [float(arg) for arg in sys.argv[1:]] or STEPS
+
+    frames, labels = load_tail(dataset_dir, fraction)
+    if not frames:
+        print(f"❌ No 42-feature .npy files found in {dataset_dir}")
+        return
+    if os.path.abspath(dataset_dir) == default_dataset:
+        print("⚠️  Replaying the training dataset: accuracy is optimistic, compare agreement only")
+
+    preload_model()
+    reference, reference_ms = replay(frames, None)
+    print(f"\n{len(frames)} frames; uncached accuracy {np.mean(reference == labels) * 100:.1f}%, "
+          f"{reference_ms:.3f} ms/frame\n")
+    print(f"{'step':>8} {'hit rate':>9} {'agreement':>10} {'accuracy':>9} {'ms/frame':>9}")
+
+    best = None
+    for step in steps:
+        signs, ms = replay(frames, step)
+        hit_rate = get_prediction_cache_stats()["hit_rate"]
+        agreement = np.mean(signs == reference)
+        print(f"{step:>8} {hit_rate * 100:>8.1f}% {agreement * 100:>9.1f}% "
+              f"{np.mean(signs == labels) * 100:>8.1f}% {ms:>9.3f}")
+        if agreement >= min_agreement and (best is None or step > best):
+            best = step
+    enable_prediction_cache(None)
+
+    if best is None:
+        print(f"\n⚠️  No step keeps {min_agreement * 100:.0f}% agreement; leave the cache off")
+    else:
+        print(f"\n✅ Recommended: SIGN_PREDICTION_CACHE_STEP={best}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Text-to-speech off the capture loop.
+
+pyttsx3's runAndWait blocks for the whole utterance, so the desktop apps
+hand sentences to a SpeechWorker instead. Its thread owns the engine
+(pyttsx3 engines must stay on the thread that created them) and speaks
+from a small bounded queue:
+  - a sentence that extends the newest waiting one replaces it, since the
+    builder's sentences grow word by word
+  - when the queue is full the oldest waiting sentence is dropped
+so speech follows the latest sentence instead of falling behind.
+"""
+import time
+import threading
+from collections import deque
+
+import pyttsx3
+
+
+class SpeechWorker:
+    def __init__(self, rate=150, max_queue=2):
+        self.rate = rate
+        self.max_queue = max(1, int(max_queue))
+        self._pending = deque()        # (text, enqueued)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._queued = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._spoken = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._speak_total = 0.0
+        self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+        self._thread.start()
+
+    def say(self, text):
+        """Queue `text` and return at once"""
+        now = time.monotonic()
+        with self._cond:
+            if self._stopping:
+                return
+            self._queued += 1
+            if self._pending and text.startswith(self._pending[-1][0]):
+                # Same sentence, more words: keep its place in line
+                self._pending[-1] = (text, self._pending[-1][1])
+                self._coalesced += 1
+            else:
+                if len(self._pending) >= self.max_queue:
+                    self._pending.popleft()
+                    self._dropped += 1
+                self._pending.append((text, now))
+            self._max_depth = max(self._max_depth, len(self._pending))
+            self._cond.notify()
+
+    def clear(self):
+        """Forget sentences that have not started yet"""
+        with self._cond:
+            self._dropped += len(self._pending)
+            self._pending.clear()
+
+    def _run(self):
+        try:
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+        except Exception as e:
+            print(f"❌ Text-to-speech unavailable: {e}")
+            with self._cond:
+                self._stopping = True
+                self._pending.clear()
+            return
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                text, enqueued = self._pending.popleft()
+
+            start = time.monotonic()
+            try:
+                engine.say(text)
+                engine.runAndWait()
+            except Exception as e:
+                print(f"❌ Speech failed: {e}")
+                with self._cond:
+                    self._failed += 1
+                continue
+            finished = time.monotonic()
+            with self._cond:
+                self._spoken += 1
+                self._wait_total += start - enqueued
+                self._wait_max = max(self._wait_max, start - enqueued)
+                self._speak_total += finished - start
+
+    def stop(self, timeout=None):
+        """Stop after the current utterance; waiting sentences are dropped"""
+        with self._cond:
+            self._stopping = True
+            self._dropped += len(self._pending)
+            self._pending.clear()
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Queue depth and latency (queued -> speech starts) in milliseconds"""
+        with self._cond:
+            spoken = self._spoken
+            return {
+                'depth': len(self._pending),
+                'max_depth': self._max_depth,
+                'queued': self._queued,
+                'coalesced': self._coalesced,
+                'dropped': self._dropped,
+                'spoken': spoken,
+                'failed': self._failed,
+                'avg_latency_ms': self._wait_total / spoken * 1000 if spoken else 0.0,
+                'max_latency_ms': self._wait_max * 1000,
+                'avg_speech_ms': self._speak_total / spoken * 1000 if spoken else 0.0,
+            }
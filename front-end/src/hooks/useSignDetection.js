@@ -10,12 +10,16 @@ import socketService from '../services/socket'
  * @param {string} roomId - Current room ID
  * @param {string} userId - Current user ID
  * @param {string} userName - Current user name
- * @returns {Object} - Detection state and controls
+ * @returns {Object} - Detection state and controls (sentences: senderId -> { seq, words, name },
+ *   the server-side sign transcript; captionHistory: speech captions)
  */
 export const useSignDetection = (isActive, videoRef, roomId, userId, userName) => {
   const [isDetecting, setIsDetecting] = useState(false)
   const [lastDetectedSign, setLastDetectedSign] = useState(null)
   const [captionHistory, setCaptionHistory] = useState([])
+  const [sentences, setSentences] = useState({})
+  // Latest sentences for the socket handlers, which must not read state inside updaters
+  const sentencesRef = useRef({})
   const intervalRef = useRef(null)
   const canvasRef = useRef(null)
 
@@ -49,15 +53,18 @@ export const useSignDetection = (isActive, videoRef, roomId, userId, userName) =
       const ctx = canvas.getContext('2d')
       ctx.drawImage(video, 0, 0, canvas.width, canvas.height)
 
-      // Convert canvas to base64
-      const frameData = canvas.toDataURL('image/jpeg', 0.8)
-
-      // Send to backend for detection
-      const response = await api.post('/sign/detect', {
-        frame: frameData,
-        room_id: roomId,
-        user_id: userId,
-        timestamp: Date.now()
+      // Encode canvas to a JPEG blob
+      const frameData = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8))
+      if (!frameData) return
+
+      // Send to backend for detection as multipart (no base64 overhead)
+      const form = new FormData()
+      form.append('frame', frameData, 'frame.jpg')
+      form.append('room_id', roomId)
+      form.append('user_id', userId)
+      form.append('timestamp', Date.now())
+      const response = await api.post('/sign/detect', form, {
+        headers: { 'Content-Type': 'multipart/form-data' }
       })
 
       const { detected, sign } = response.data
@@ -67,16 +74,8 @@ export const useSignDetection = (isActive, videoRef, roomId, userId, userName) =
         if (sign !== lastDetectedSign) {
           setLastDetectedSign(sign)
           
-          // Send caption to room via Socket.IO
+          // Send caption to room via Socket.IO; the server adds it to our sentence
           socketService.sendCaption(roomId, sign, 'sign', userId, userName)
-          
-          // Add to local history
-          setCaptionHistory(prev => [...prev, {
-            text: sign,
-            type: 'sign',
-            sender: userName,
-            timestamp: new Date().toISOString()
-          }])
         }
       }
     } catch (error) {
@@ -109,11 +108,12 @@ export const useSignDetection = (isActive, videoRef, roomId, userId, userName) =
     setLastDetectedSign(null)
   }
 
-  // Listen for captions from other users
+  // Listen for speech captions; signs arrive as sentence deltas below
   useEffect(() => {
     if (!roomId) return
 
     const handleReceiveCaption = (data) => {
+      if (data.type === 'sign') return
       setCaptionHistory(prev => [...prev, {
         text: data.caption,
         type: data.type,
@@ -130,6 +130,53 @@ export const useSignDetection = (isActive, videoRef, roomId, userId, userName) =
     }
   }, [roomId])
 
+  // Keep each sender's sentence in sync from server deltas
+  useEffect(() => {
+    if (!roomId) return
+
+    const applySentences = (next) => {
+      sentencesRef.current = next
+      setSentences(next)
+    }
+
+    const handleSnapshot = (data) => {
+      if (data.room !== roomId) return
+      const next = {}
+      // One entry per sign; a sign such as "I LOVE YOU" contains spaces
+      data.sentences.forEach(({ sender_id, seq, words }) => {
+        const name = sentencesRef.current[sender_id]?.name
+        next[sender_id] = { seq, words: [...words], name }
+      })
+      applySentences(next)
+    }
+
+    const handleDelta = (data) => {
+      const prev = sentencesRef.current
+      const current = prev[data.sender_id]
+      if (!data.reset && (!current || data.seq !== current.seq + 1)) {
+        // Missed a delta; fetch the full sentences instead
+        socketService.emit('get_sentence', { room: roomId })
+        return
+      }
+      const words = data.reset ? [] : current.words.slice(data.drop)
+      if (data.append) words.push(data.append)
+      applySentences({ ...prev, [data.sender_id]: { seq: data.seq, words, name: data.sender_name } })
+    }
+
+    socketService.socket?.on('sentence_snapshot', handleSnapshot)
+    socketService.socket?.on('sentence_delta', handleDelta)
+    socketService.emit('get_sentence', { room: roomId })
+
+    return () => {
+      socketService.socket?.off('sentence_snapshot', handleSnapshot)
+      socketService.socket?.off('sentence_delta', handleDelta)
+    }
+  }, [roomId])
+
+  const clearSentence = () => {
+    socketService.emit('clear_sentence', { room: roomId, sender_id: userId, sender_name: userName })
+  }
+
   // Auto-start/stop based on isActive
   useEffect(() => {
     if (isActive && roomId && videoRef?.current) {
@@ -148,6 +195,8 @@ export const useSignDetection = (isActive, videoRef, roomId, userId, userName) =
     lastDetectedSign,
     captionHistory,
     setCaptionHistory,
+    sentences,
+    clearSentence,
     startDetection,
     stopDetection
   }
@@ -131,17 +131,22 @@ export const useWebRTC = (roomId) => {
       const ctx = canvas.getContext('2d')
       ctx.drawImage(video, 0, 0, canvas.width, canvas.height)
 
-      // Convert to base64 JPEG
-      const frameData = canvas.toDataURL('image/jpeg', 0.6) // Lower quality for faster transfer
-
-      // Send frame to backend via Socket.IO
-      socketService.emit('video_frame', {
-        room: roomId,
-        frame: frameData,
-        sender_id: user.uid,
-        sender_name: user.name || user.email,
-        timestamp: Date.now()
-      })
+      const timestamp = Date.now()
+
+      // Encode to JPEG and send as a binary attachment (no base64 overhead)
+      canvas.toBlob(async (blob) => {
+        if (!blob) return
+        const frameData = await blob.arrayBuffer()
+
+        // Send frame to backend via Socket.IO
+        socketService.emit('video_frame', {
+          room: roomId,
+          frame: frameData,
+          sender_id: user.uid,
+          sender_name: user.name || user.email,
+          timestamp
+        })
+      }, 'image/jpeg', 0.6) // Lower quality for faster transfer
     } catch (error) {
       // Silently handle errors to avoid console spam
       if (error.message && !error.message.includes('canvas')) {
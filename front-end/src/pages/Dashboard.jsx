@@ -37,7 +37,9 @@ function Dashboard() {
   const {
     isDetecting,
     captionHistory,
-    setCaptionHistory
+    setCaptionHistory,
+    sentences,
+    clearSentence
   } = useSignDetection(
     isCallActive,
     localVideoRef,
@@ -58,6 +60,9 @@ function Dashboard() {
     isMuted
   )
 
+  // Senders with a non-empty sign sentence
+  const signSentences = Object.entries(sentences).filter(([, sentence]) => sentence.words.length > 0)
+
   // Generate random room ID
   const generateRoomId = () => {
     return Math.random().toString(36).substring(2, 10).toUpperCase()
@@ -275,14 +280,36 @@ function Dashboard() {
                     </div>
                   </div>
                   <button
-                    onClick={() => setCaptionHistory([])}
+                    onClick={() => {
+                      setCaptionHistory([])
+                      clearSentence()
+                    }}
                     className="text-xs text-gray-400 hover:text-white"
                   >
                     Clear
                   </button>
                 </div>
                 <div className="space-y-2">
-                  {captionHistory.length === 0 ? (
+                  {/* Sign transcript kept by the server, one sentence per sender */}
+                  {signSentences.map(([senderId, sentence]) => (
+                    <div
+                      key={`sentence-${senderId}`}
+                      className="p-2 rounded bg-blue-900/50 border-l-4 border-blue-400"
+                    >
+                      <div className="flex items-start gap-2">
+                        <span className="text-xs text-gray-300 min-w-fit">
+                          {senderId === user?.uid ? 'You' : sentence.name || 'User'}:
+                        </span>
+                        <span className="text-white font-medium">
+                          {sentence.words.join(' ')}
+                        </span>
+                        <span className="text-xs ml-auto min-w-fit">
+                          <span className="text-blue-300">👋 Sign</span>
+                        </span>
+                      </div>
+                    </div>
+                  ))}
+                  {captionHistory.length === 0 && signSentences.length === 0 ? (
                     <p className="text-gray-400 text-sm text-center py-2">
                       Captions will appear here...
                     </p>